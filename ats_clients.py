@@ -0,0 +1,216 @@
+# ats_clients.py – JSON job-feed clients for the common applicant tracking systems.
+# Most ATS boards publish a small public JSON feed next to their HTML page; reading it
+# gives real titles/locations for a fraction of the bytes and no HTML parsing.
+# parse_ats_url() works out the board token from a careers URL, fetch_postings() reads the feed.
+
+
+import re
+import logging
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger("ats_clients")
+
+# hosts that serve Greenhouse boards (not www.greenhouse.io, the marketing site)
+GREENHOUSE_HOSTS = ("boards.greenhouse.io", "job-boards.greenhouse.io", "boards.eu.greenhouse.io",
+                    "job-boards.eu.greenhouse.io", "boards-api.greenhouse.io")
+# subdomains of company-per-subdomain ATSs that are the vendor's own site, not a company
+VENDOR_SUBDOMAINS = {"www", "app", "api", "help", "support", "blog", "status"}
+
+
+class AtsTarget:
+    #A specific job board on a specific ATS (e.g. greenhouse / "sweep")
+
+    def __init__(self, platform, token, board_url, host=None, site=None):
+        self.platform = platform
+        self.token = token
+        self.board_url = board_url
+        self.host = host
+        self.site = site
+
+    def __repr__(self):
+        return f"AtsTarget({self.platform!r}, {self.token!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, AtsTarget) and (self.platform, self.token, self.host, self.site) == \
+            (other.platform, other.token, other.host, other.site)
+
+    def __hash__(self):
+        return hash((self.platform, self.token, self.host, self.site))
+
+
+def _first_segment(path):
+    parts = [p for p in path.split("/") if p]
+    return parts[0] if parts else None
+
+
+def parse_ats_url(url):
+    #Careers/ATS URL -> AtsTarget, or None if it isn't a board we know how to read
+    if not url:
+        return None
+    u = urlparse(url if "://" in url else "https://" + url)
+    host = (u.hostname or "").lower()
+    path = u.path or ""
+
+    if host in GREENHOUSE_HOSTS:
+        token = parse_qs(u.query).get("for", [None])[0]
+        if not token and host == "boards-api.greenhouse.io":
+            m = re.match(r"/v1/boards/([^/]+)", path)
+            token = m.group(1) if m else None
+        elif not token and "/embed/" not in path:
+            token = _first_segment(path)
+        if token:
+            return AtsTarget("greenhouse", token, f"https://boards.greenhouse.io/{token}")
+    elif host in ("jobs.lever.co", "jobs.eu.lever.co"):
+        token = _first_segment(path)
+        if token:
+            return AtsTarget("lever", token, f"https://{host}/{token}", host=host)
+    elif host in ("api.lever.co", "api.eu.lever.co"):
+        m = re.match(r"/v0/postings/([^/?]+)", path)
+        if m:
+            jobs_host = host.replace("api.", "jobs.", 1)
+            return AtsTarget("lever", m.group(1), f"https://{jobs_host}/{m.group(1)}", host=jobs_host)
+    elif host == "jobs.ashbyhq.com":
+        token = _first_segment(path)
+        if token:
+            return AtsTarget("ashby", token, f"https://jobs.ashbyhq.com/{token}")
+    elif host.endswith(".myworkdayjobs.com") and host.split(".")[0] not in VENDOR_SUBDOMAINS:
+        tenant = host.split(".")[0]
+        parts = [p for p in path.split("/") if p]
+        # optional locale segment first, e.g. /en-US/External
+        if parts and re.fullmatch(r"[a-z]{2}-[A-Z]{2}", parts[0]):
+            parts = parts[1:]
+        if parts:
+            return AtsTarget("workday", tenant, f"https://{host}/{parts[0]}", host=host, site=parts[0])
+    elif host in ("jobs.smartrecruiters.com", "careers.smartrecruiters.com"):
+        token = _first_segment(path)
+        if token:
+            return AtsTarget("smartrecruiters", token, f"https://jobs.smartrecruiters.com/{token}")
+    elif host == "apply.workable.com":
+        token = _first_segment(path)
+        if token:
+            return AtsTarget("workable", token, f"https://apply.workable.com/{token}")
+    elif host.endswith(".recruitee.com") and host.split(".")[0] not in VENDOR_SUBDOMAINS:
+        token = host.split(".")[0]
+        return AtsTarget("recruitee", token, f"https://{host}")
+    elif host.endswith(".bamboohr.com") and host.split(".")[0] not in VENDOR_SUBDOMAINS:
+        token = host.split(".")[0]
+        return AtsTarget("bamboohr", token, f"https://{host}/careers")
+    return None
+
+
+def _join_location(*parts):
+    return ", ".join(p for p in parts if p) or "Remote"
+
+
+def _greenhouse(target, fetcher, limit):
+    data = fetcher.get_json(f"https://boards-api.greenhouse.io/v1/boards/{target.token}/jobs")
+    jobs = []
+    for j in (data or {}).get("jobs", [])[:limit]:
+        jobs.append({"title": j.get("title", ""), "url": j.get("absolute_url", ""),
+                     "location": (j.get("location") or {}).get("name") or "Remote"})
+    return jobs
+
+
+def _lever(target, fetcher, limit):
+    api_host = "api.eu.lever.co" if target.host == "jobs.eu.lever.co" else "api.lever.co"
+    data = fetcher.get_json(f"https://{api_host}/v0/postings/{target.token}?mode=json&limit={limit}")
+    jobs = []
+    for j in (data if isinstance(data, list) else [])[:limit]:
+        jobs.append({"title": j.get("text", ""), "url": j.get("hostedUrl", ""),
+                     "location": (j.get("categories") or {}).get("location") or "Remote"})
+    return jobs
+
+
+def _ashby(target, fetcher, limit):
+    data = fetcher.get_json(f"https://api.ashbyhq.com/posting-api/job-board/{target.token}")
+    jobs = []
+    for j in (data or {}).get("jobs", [])[:limit]:
+        loc = j.get("location") or ("Remote" if j.get("isRemote") else "")
+        jobs.append({"title": j.get("title", ""), "url": j.get("jobUrl", ""), "location": loc or "Remote"})
+    return jobs
+
+
+def _workday(target, fetcher, limit):
+    # the only POST feed in the set
+    api = f"https://{target.host}/wday/cxs/{target.token}/{target.site}/jobs"
+    res = fetcher.fetch(api, method="POST", retries=1,
+                        json={"appliedFacets": {}, "limit": max(limit, 1), "offset": 0, "searchText": ""})
+    if res.status != 200:
+        return []
+    try:
+        data = res.json()
+    except ValueError:
+        return []
+    jobs = []
+    for j in data.get("jobPostings", [])[:limit]:
+        jobs.append({"title": j.get("title", ""),
+                     "url": f"https://{target.host}/{target.site}{j.get('externalPath', '')}",
+                     "location": j.get("locationsText") or "Remote"})
+    return jobs
+
+
+def _smartrecruiters(target, fetcher, limit):
+    data = fetcher.get_json(f"https://api.smartrecruiters.com/v1/companies/{target.token}/postings?limit={limit}")
+    jobs = []
+    for j in (data or {}).get("content", [])[:limit]:
+        loc = j.get("location") or {}
+        location = "Remote" if loc.get("remote") else _join_location(loc.get("city"), loc.get("country"))
+        jobs.append({"title": j.get("name", ""),
+                     "url": f"https://jobs.smartrecruiters.com/{target.token}/{j.get('id', '')}",
+                     "location": location})
+    return jobs
+
+
+def _workable(target, fetcher, limit):
+    data = fetcher.get_json(f"https://apply.workable.com/api/v1/widget/accounts/{target.token}")
+    jobs = []
+    for j in (data or {}).get("jobs", [])[:limit]:
+        location = "Remote" if j.get("telecommuting") else _join_location(j.get("city"), j.get("country"))
+        jobs.append({"title": j.get("title", ""), "url": j.get("url") or j.get("application_url", ""),
+                     "location": location})
+    return jobs
+
+
+def _recruitee(target, fetcher, limit):
+    data = fetcher.get_json(f"https://{target.token}.recruitee.com/api/offers/")
+    jobs = []
+    for j in (data or {}).get("offers", [])[:limit]:
+        jobs.append({"title": j.get("title", ""), "url": j.get("careers_url", ""),
+                     "location": j.get("location") or "Remote"})
+    return jobs
+
+
+def _bamboohr(target, fetcher, limit):
+    data = fetcher.get_json(f"https://{target.token}.bamboohr.com/careers/list")
+    jobs = []
+    for j in (data or {}).get("result", [])[:limit]:
+        loc = j.get("location") or {}
+        jobs.append({"title": j.get("jobOpeningName", ""),
+                     "url": f"https://{target.token}.bamboohr.com/careers/{j.get('id', '')}",
+                     "location": _join_location(loc.get("city"), loc.get("state"))})
+    return jobs
+
+
+CLIENTS = {
+    "greenhouse": _greenhouse,
+    "lever": _lever,
+    "ashby": _ashby,
+    "workday": _workday,
+    "smartrecruiters": _smartrecruiters,
+    "workable": _workable,
+    "recruitee": _recruitee,
+    "bamboohr": _bamboohr,
+}
+
+
+def fetch_postings(target, fetcher, limit=3):
+    #Structured postings for a board, or [] so the caller can fall back to HTML
+    client = CLIENTS.get(target.platform) if target else None
+    if client is None:
+        return []
+    try:
+        jobs = client(target, fetcher, limit)
+    except Exception as e:
+        logger.debug(f"{target.platform} feed failed for {target.token}: {e}")
+        return []
+    return [j for j in jobs if j["title"] and j["url"]]
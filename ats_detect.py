@@ -0,0 +1,121 @@
+# ats_detect.py – works out which ATS a careers page really uses.
+# URL substrings only catch pages hosted on the ATS itself; many company pages embed a
+# Greenhouse/Lever/Ashby board in an iframe or script, or redirect to one. This looks at
+# the URL, the final URL after redirects, every ATS URL in the page source (src/href/JS
+# strings) and a few known embed snippets, and returns a canonical AtsTarget. Embeds, feed
+# URLs and posting links outrank a bare board link (often just a "Powered by" footer).
+# Hits are remembered per domain so the rest of that site goes straight to the feed -
+# except on hosts many companies share (notion.so, sites.google.com, ...), where they are
+# remembered per URL.
+
+
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from ats_clients import AtsTarget, parse_ats_url
+from rate_limiter import host_of
+
+ATS_HOSTS = r"(?:greenhouse\.io|lever\.co|ashbyhq\.com|myworkdayjobs\.com|smartrecruiters\.com" \
+            r"|apply\.workable\.com|recruitee\.com|bamboohr\.com)"
+# any absolute URL on an ATS host, including JSON-escaped ones (https:\/\/...)
+ATS_URL_RE = re.compile(r"https?:(?:\\?/){2}[^\s\"'<>()]*?" + ATS_HOSTS + r"[^\s\"'<>()]*", re.I)
+
+# embed snippets that name the board without a usable URL
+EMBED_SIGNATURES = [
+    ("greenhouse", re.compile(r"Grnhse\.Settings\.boardToken\s*=\s*[\"']([\w-]+)[\"']")),
+    ("lever", re.compile(r"leverJobsOptions\s*=\s*\{[^}]*accountName\s*:\s*[\"']([\w-]+)[\"']", re.S)),
+]
+# hosts where each company is a path, not a subdomain - a hit there says nothing about the next company
+SHARED_HOSTS = ("notion.so", "sites.google.com", "docs.google.com", "wellfound.com", "angel.co",
+                "linkedin.com", "ycombinator.com", "welcometothejungle.com", "medium.com", "github.com",
+                "gitlab.com", "airtable.com", "typeform.com", "breezy.hr", "workatastartup.com")
+# first path segments on ATS hosts that are the vendor's own pages, never a company's board
+NON_BOARD_TOKENS = {"privacy", "privacy-policy", "privacy_policy", "terms", "terms-of-service", "legal",
+                    "security", "cookies", "cookie-policy", "about", "blog", "embed", "login", "signin",
+                    "static", "assets", "favicon.ico", "robots.txt", "sitemap.xml"}
+BOARD_URLS = {
+    "greenhouse": "https://boards.greenhouse.io/{}",
+    "lever": "https://jobs.lever.co/{}",
+}
+
+
+def _board_reference(url):
+    # an embed, a feed or a posting link names the board the page actually uses;
+    # a bare board-root link may just be a "Powered by" footer
+    u = urlparse(url)
+    if "for=" in u.query or "/embed/" in u.path or u.hostname.startswith(("boards-api.", "api.")):
+        return True
+    return len([p for p in u.path.split("/") if p]) >= 2
+
+
+def scan_page(text):
+    #Best AtsTarget found in a page's source, or None
+    found = Counter()
+    strong = Counter()
+    for m in ATS_URL_RE.finditer(text or ""):
+        url = m.group(0).replace("\\/", "/")
+        target = parse_ats_url(url)
+        if target and target.token.lower() not in NON_BOARD_TOKENS:
+            found[target] += 1
+            strong[target] += _board_reference(url)
+    for platform, pattern in EMBED_SIGNATURES:
+        m = pattern.search(text or "")
+        if m and m.lastindex and m.group(1) and m.group(1).lower() not in NON_BOARD_TOKENS:
+            token = m.group(1)
+            target = AtsTarget(platform, token, BOARD_URLS[platform].format(token))
+            found[target] += 1
+            strong[target] += 1
+    if not found:
+        return None
+    # embeds, feeds and posting links beat plain links, then the board named most often
+    # wins (first seen on ties)
+    return max(found, key=lambda t: (strong[t], found[t]))
+
+
+def cache_key(url):
+    #What a hit is remembered under: the host, or the whole URL on a shared host
+    host = host_of(url)
+    if any(host == h or host.endswith("." + h) for h in SHARED_HOSTS):
+        return url
+    return host
+
+
+class AtsDetector:
+    def __init__(self):
+        self._by_domain = {}   # domain (or URL on a shared host) -> AtsTarget (hits only)
+        self._misses = set()   # URLs already checked with no result
+        self._lock = threading.Lock()
+
+    def detect(self, url, doc=None):
+        """AtsTarget for a careers URL, using the fetched page (html_parser.Document) when given."""
+        if not url:
+            return None
+        target = parse_ats_url(url)
+        if target:
+            return target
+        domain = cache_key(url)
+        with self._lock:
+            if domain in self._by_domain:
+                return self._by_domain[domain]
+            if url in self._misses:
+                return None
+        if doc is None:
+            return None
+        target = parse_ats_url(doc.final_url) or scan_page(doc.text)
+        with self._lock:
+            if target:
+                self._by_domain[domain] = target
+            else:
+                self._misses.add(url)
+        if target:
+            doc.platform = target.platform
+        return target
+
+
+_default = AtsDetector()
+
+
+def detect_ats(url, doc=None):
+    return _default.detect(url, doc)
@@ -0,0 +1,68 @@
+# bench_parsers.py – compare HTML parser backends on saved pages.
+# Usage:
+#   python bench_parsers.py                 # pages in fixtures/*.html (a small committed set:
+#                                           # careers page, Greenhouse/Lever boards, board listing, homepage)
+#   python bench_parsers.py --from-cache 20 # first add the 20 largest HTML pages from the HTTP cache
+#   python bench_parsers.py page1.html page2.html
+
+
+import glob
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+from html_parser import available_backends, make_soup, iter_links
+from http_cache import CACHE_FILE
+
+FIXTURE_DIR = "fixtures"
+
+
+def dump_from_cache(n, cache_file=CACHE_FILE, out_dir=FIXTURE_DIR):
+    #Write the n largest cached HTML bodies out as fixture pages
+    os.makedirs(out_dir, exist_ok=True)
+    db = sqlite3.connect(cache_file)
+    rows = db.execute(
+        "SELECT b.hash, b.body FROM entries e JOIN blobs b ON b.hash = e.body_hash "
+        "WHERE e.content_type LIKE '%html%' GROUP BY b.hash ORDER BY b.size DESC LIMIT ?", (n,)).fetchall()
+    for digest, body in rows:
+        # cache-*.html are git-ignored; the committed fixtures stay as they are
+        with open(os.path.join(out_dir, f"cache-{digest[:16]}.html"), "wb") as fh:
+            fh.write(zlib.decompress(body))
+    db.close()
+    print(f"Saved {len(rows)} pages to {out_dir}/")
+
+
+def bench(pages, rounds=3):
+    docs = [open(p, encoding="utf-8", errors="replace").read() for p in pages]
+    total_kb = sum(len(d) for d in docs) / 1024
+    print(f"{len(docs)} pages, {total_kb:.0f} KB, best of {rounds} rounds\n")
+    print(f"{'backend':<14}{'parse (ms)':>12}{'parse+links (ms)':>18}{'links':>8}")
+    for backend in available_backends():
+        best_parse = best_links = float("inf")
+        n_links = 0
+        for _ in range(rounds):
+            t = time.perf_counter()
+            if backend != "selectolax":
+                for d in docs:
+                    make_soup(d, backend)
+            best_parse = min(best_parse, time.perf_counter() - t)
+
+            t = time.perf_counter()
+            n_links = sum(sum(1 for _ in iter_links(d, backend)) for d in docs)
+            best_links = min(best_links, time.perf_counter() - t)
+        parse_ms = "-" if backend == "selectolax" else f"{best_parse * 1000:.1f}"
+        print(f"{backend:<14}{parse_ms:>12}{best_links * 1000:>18.1f}{n_links:>8}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--from-cache"]:
+        dump_from_cache(int(args[1]) if len(args) > 1 else 20)
+        args = args[2:]
+    pages = args or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    if not pages:
+        print(f"No pages found - put some in {FIXTURE_DIR}/ or use --from-cache N after a run.")
+        sys.exit(1)
+    bench(pages)
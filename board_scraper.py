@@ -2,143 +2,78 @@
 board_scraper.py - Enhanced with more climate job boards
 """
 
-import requests
-import time
-import random
 import re
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import logging
 
+from html_parser import make_soup
+from board_sources import REGISTRY, BoardScheduler, JobRecord, register
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
-
 
-def safe_get(url, timeout=15):
-    """Safe GET request with retry"""
-    time.sleep(random.uniform(1.0, 2.5))
-    for attempt in range(2):
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=timeout)
-            if r.status_code == 200:
-                return r.text
-            time.sleep(2)
-        except Exception as e:
-            logger.debug(f"Request failed: {e}")
-            time.sleep(2)
-    return None
+# --- page parsers: one page of HTML -> list of JobRecords, registered as sources ------------
 
-
-def climatetechlist_jobs():
-    """Scrape ClimateTechList.com"""
+@register("ClimateTechList", "https://climatetechlist.com/jobs?page={page}", pages=5, limit=80)
+def parse_climatetechlist(html):
+    """Jobs on one ClimateTechList.com page"""
     jobs = []
-    logger.info("Scraping ClimateTechList...")
+    soup = make_soup(html)
     
-    for page in range(1, 6):  # 5 pages
-        if len(jobs) >= 80:
-            break
-        
-        html = safe_get(f"https://climatetechlist.com/jobs?page={page}")
-        if not html:
-            break
+    # Try multiple selectors
+    cards = soup.find_all("div", class_=re.compile("job|posting"))
+    if not cards:
+        cards = soup.find_all("a", href=re.compile("/jobs/"))
+    
+    for card in cards:
+        link = card if card.name == "a" else card.find("a")
+        if not link or not link.get("href"):
+            continue
         
-        soup = BeautifulSoup(html, "html.parser")
+        title_elem = card.find(class_=re.compile("title|name|heading"))
+        title = title_elem.get_text(strip=True) if title_elem else link.get_text(strip=True)
         
-        # Try multiple selectors
-        cards = soup.find_all("div", class_=re.compile("job|posting"))
-        if not cards:
-            cards = soup.find_all("a", href=re.compile("/jobs/"))
+        company_elem = card.find(class_=re.compile("company"))
+        company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
         
-        for card in cards:
-            if len(jobs) >= 80:
-                break
-            
-            link = card if card.name == "a" else card.find("a")
-            if not link or not link.get("href"):
-                continue
-            
-            title_elem = card.find(class_=re.compile("title|name|heading"))
-            title = title_elem.get_text(strip=True) if title_elem else link.get_text(strip=True)
-            
-            company_elem = card.find(class_=re.compile("company"))
-            company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
-            
-            location_elem = card.find(class_=re.compile("location"))
-            location = location_elem.get_text(strip=True) if location_elem else "Remote"
-            
-            jobs.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "url": urljoin("https://climatetechlist.com", link["href"]),
-                "board": "ClimateTechList",
-            })
+        location_elem = card.find(class_=re.compile("location"))
+        location = location_elem.get_text(strip=True) if location_elem else "Remote"
         
-        logger.info(f"  ClimateTechList page {page}: {len(jobs)} jobs so far")
-    
+        jobs.append(JobRecord(title, company, location, urljoin("https://climatetechlist.com", link["href"]), "ClimateTechList"))
     return jobs
 
 
-def climatebase_jobs():
-    """Scrape Climatebase.org"""
+@register("Climatebase", "https://climatebase.org/jobs?page={page}", pages=5, limit=80)
+def parse_climatebase(html):
+    """Jobs on one Climatebase.org page"""
     jobs = []
-    logger.info("Scraping Climatebase...")
+    soup = make_soup(html)
     
-    for page in range(1, 6):
-        if len(jobs) >= 80:
-            break
-        
-        html = safe_get(f"https://climatebase.org/jobs?page={page}")
-        if not html:
-            break
+    cards = soup.find_all(["div", "article"], class_=re.compile("job|position"))
+    
+    for card in cards:
+        link = card.find("a", href=True)
+        if not link:
+            continue
         
-        soup = BeautifulSoup(html, "html.parser")
+        title = link.get_text(strip=True)
         
-        cards = soup.find_all(["div", "article"], class_=re.compile("job|position"))
+        company_elem = card.find(class_=re.compile("company|organization"))
+        company = company_elem.get_text(strip=True) if company_elem else "Unknown"
         
-        for card in cards:
-            if len(jobs) >= 80:
-                break
-            
-            link = card.find("a", href=True)
-            if not link:
-                continue
-            
-            title = link.get_text(strip=True)
-            
-            company_elem = card.find(class_=re.compile("company|organization"))
-            company = company_elem.get_text(strip=True) if company_elem else "Unknown"
-            
-            location_elem = card.find(class_=re.compile("location"))
-            location = location_elem.get_text(strip=True) if location_elem else "Remote"
-            
-            jobs.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "url": urljoin("https://climatebase.org", link["href"]),
-                "board": "Climatebase",
-            })
+        location_elem = card.find(class_=re.compile("location"))
+        location = location_elem.get_text(strip=True) if location_elem else "Remote"
         
-        logger.info(f"  Climatebase page {page}: {len(jobs)} jobs so far")
-    
+        jobs.append(JobRecord(title, company, location, urljoin("https://climatebase.org", link["href"]), "Climatebase"))
     return jobs
 
 
-def terra_do_jobs():
-    """Scrape Terra.do job board"""
+@register("Terra.do", "https://www.terra.do/climate-jobs/job-board/", limit=40)
+def parse_terra_do(html):
+    """Jobs on the Terra.do job board"""
     jobs = []
-    logger.info("Scraping Terra.do...")
-    
-    html = safe_get("https://www.terra.do/climate-jobs/job-board/")
-    if not html:
-        return jobs
-    
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     
     cards = soup.find_all("div", class_=re.compile("job|card"))[:40]
     
@@ -155,28 +90,15 @@ def terra_do_jobs():
         location_elem = card.find(class_=re.compile("location"))
         location = location_elem.get_text(strip=True) if location_elem else "Remote"
         
-        jobs.append({
-            "title": title,
-            "company": company,
-            "location": location,
-            "url": urljoin("https://www.terra.do", link["href"]),
-            "board": "Terra.do",
-        })
-    
-    logger.info(f"  Terra.do: {len(jobs)} jobs")
+        jobs.append(JobRecord(title, company, location, urljoin("https://www.terra.do", link["href"]), "Terra.do"))
     return jobs
 
 
-def work_on_climate_jobs():
-    """Scrape WorkOnClimate.org"""
+@register("WorkOnClimate", "https://workonclimate.org/job-board", limit=40)
+def parse_work_on_climate(html):
+    """Jobs on the WorkOnClimate.org job board"""
     jobs = []
-    logger.info("Scraping WorkOnClimate...")
-    
-    html = safe_get("https://workonclimate.org/job-board")
-    if not html:
-        return jobs
-    
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     
     # WorkOnClimate may have different structure
     cards = soup.find_all(["div", "li"], class_=re.compile("job|listing"))[:40]
@@ -193,21 +115,40 @@ def work_on_climate_jobs():
         company_elem = card.find(class_=re.compile("company|employer"))
         company = company_elem.get_text(strip=True) if company_elem else "Unknown"
         
-        location = "Remote"
-        
-        jobs.append({
-            "title": title,
-            "company": company,
-            "location": location,
-            "url": urljoin("https://workonclimate.org", link["href"]),
-            "board": "WorkOnClimate",
-        })
-    
-    logger.info(f"  WorkOnClimate: {len(jobs)} jobs")
+        jobs.append(JobRecord(title, company, "Remote", urljoin("https://workonclimate.org", link["href"]), "WorkOnClimate"))
     return jobs
 
 
-def scrape_200_climate_jobs():
+def _scrape_source(name, seen=None):
+    # one source on its own, page after page (what the per-board functions below do);
+    # pass a SeenIndex to only get postings that are new since the last run
+    jobs = REGISTRY[name].scrape(seen)
+    if seen is not None:
+        seen.mark(jobs)  # handed to the caller - nothing else stores them
+    return [job.to_dict() for job in jobs]
+
+
+def climatetechlist_jobs(seen=None):
+    """Scrape ClimateTechList.com"""
+    return _scrape_source("ClimateTechList", seen)
+
+
+def climatebase_jobs(seen=None):
+    """Scrape Climatebase.org"""
+    return _scrape_source("Climatebase", seen)
+
+
+def terra_do_jobs(seen=None):
+    """Scrape Terra.do job board"""
+    return _scrape_source("Terra.do", seen)
+
+
+def work_on_climate_jobs(seen=None):
+    """Scrape WorkOnClimate.org"""
+    return _scrape_source("WorkOnClimate", seen)
+
+
+def scrape_200_climate_jobs(quota=200, seen=None):
     """
     Main function to scrape 200 jobs from public boards
     Tries multiple sources to ensure we get enough jobs
@@ -216,31 +157,16 @@ def scrape_200_climate_jobs():
     logger.info("SCRAPING PUBLIC CLIMATE JOB BOARDS")
     logger.info("="*80 + "\n")
     
-    all_jobs = []
-    
-    # Scrape from all sources
-    sources = [
-        climatetechlist_jobs,
-        climatebase_jobs,
-        terra_do_jobs,
-        work_on_climate_jobs,
-    ]
-    
-    for source_func in sources:
-        if len(all_jobs) >= 200:
-            break
-        
-        try:
-            jobs = source_func()
-            all_jobs.extend(jobs)
-            logger.info(f"Running total: {len(all_jobs)} jobs\n")
-        except Exception as e:
-            logger.error(f"Failed to scrape {source_func.__name__}: {e}")
-            continue
+    # every registered source (these boards and extra_boards.py's) and all their pages
+    # run concurrently; stops once the quota is met
+    jobs = BoardScheduler(quota=quota, seen=seen).run()
+    if seen is not None:
+        seen.mark(jobs)
+    all_jobs = [job.to_dict() for job in jobs]
     
     logger.info(f" Finished scraping {len(all_jobs)} jobs from public boards")
     
-    return all_jobs[:200]
+    return all_jobs
 
 
 if __name__ == "__main__":
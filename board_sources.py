@@ -0,0 +1,220 @@
+# board_sources.py – registry of public job-board sources and the scheduler that runs them.
+# Every board (board_scraper.py's HTML boards, extra_boards.py's APIs and boards) registers
+# a parser with its URL, pagination and per-source limit, and yields JobRecords, so the
+# scheduler, HTTP cache and de-duplication treat all of them the same way.
+
+
+import threading
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dedup import Deduplicator
+from fetcher import get_engine
+from metrics import get_metrics
+
+logger = logging.getLogger("board_sources")
+
+
+class JobRecord:
+    #One posting from a job board
+
+    __slots__ = ("title", "company", "location", "url", "board")
+
+    def __init__(self, title, company, location, url, board):
+        self.title = title
+        self.company = company or "Unknown"
+        self.location = location or "Remote"
+        self.url = url
+        self.board = board
+
+    def to_dict(self):
+        return {"title": self.title, "company": self.company, "location": self.location,
+                "url": self.url, "board": self.board}
+
+    def to_row(self):
+        #As a long output row (output_sink.ROW_COLUMNS): the board stands in for the company's pages
+        return {
+            "Company Name": self.company,
+            "Company Description": f"From {self.board}",
+            "Website URL": "",
+            "LinkedIn URL": "",
+            "Careers Page URL": self.url,
+            "Job listings page URL": self.url,
+            "job title": self.title,
+            "job URL": self.url,
+            "job location": self.location,
+        }
+
+    def __repr__(self):
+        return f"JobRecord({self.title!r}, {self.company!r}, {self.board!r})"
+
+
+class BoardSource:
+    def __init__(self, name, url, parse, pages=1, limit=80, timeout=15, retries=None):
+        self.name = name
+        self.url = url          # "{page}" is filled in when pages > 1
+        self.parse = parse      # body text (HTML or JSON) -> list[JobRecord]
+        self.pages = pages
+        self.limit = limit
+        self.timeout = timeout
+        self.retries = retries
+
+    def page_url(self, page):
+        return self.url.format(page=page)
+
+    def fetch_page(self, page):
+        return get_engine().get_text(self.page_url(page), timeout=self.timeout, retries=self.retries)
+
+    def read(self, body):
+        #parse() plus metrics: parse time and postings found, per board. A page the parser
+        #chokes on (layout change, odd JSON) counts as empty rather than failing the run.
+        metrics = get_metrics()
+        with metrics.timer("board_parse_seconds", board=self.name):
+            try:
+                jobs = self.parse(body)
+            except Exception as e:
+                logger.warning(f"{self.name}: couldn't parse page - {e}")
+                metrics.inc("board_parse_errors_total", board=self.name)
+                return []
+        metrics.inc("jobs_found_total", len(jobs), source=self.name)
+        return jobs
+
+    def scrape(self, seen=None):
+        #This source on its own, page after page, up to its limit. With a SeenIndex only
+        #new/changed postings are returned and paging stops at a page with nothing new;
+        #the caller marks the returned postings seen once it has stored them.
+        jobs = []
+        logger.info(f"Scraping {self.name}...")
+        for page in range(1, self.pages + 1):
+            if len(jobs) >= self.limit:
+                break
+            body = self.fetch_page(page)
+            if not body:
+                break
+            found = self.read(body)
+            if not found:
+                break
+            if seen is not None:
+                found, known = seen.split(found)
+                seen.mark(known)
+                if not found:
+                    logger.info(f"  {self.name} page {page}: nothing new - stopping")
+                    break
+            found = found[: self.limit - len(jobs)]
+            jobs.extend(found)
+            logger.info(f"  {self.name} page {page}: {len(jobs)} jobs so far")
+        return jobs
+
+
+REGISTRY = {}
+
+
+def register(name, url, pages=1, limit=80, timeout=15, retries=None):
+    #Decorator: @register("Climatebase", "https://climatebase.org/jobs?page={page}", pages=5)
+    def wrap(parse):
+        REGISTRY[name] = BoardSource(name, url, parse, pages=pages, limit=limit,
+                                     timeout=timeout, retries=retries)
+        return parse
+    return wrap
+
+
+def all_sources(names=None):
+    #Registered sources (importing the modules that register them), optionally filtered by name
+    import board_scraper  # noqa: F401
+    import extra_boards  # noqa: F401
+    if names is None:
+        return list(REGISTRY.values())
+    return [REGISTRY[n] for n in names]
+
+
+class BoardScheduler:
+    """
+    Fetches every page of every source at once and collects de-duplicated jobs
+    until the combined quota is met; after that no further pages are fetched.
+    Per-host pacing still comes from the fetch engine's rate limiter.
+
+    With a SeenIndex the run is incremental: each source's pages are read in order,
+    only new or changed postings are collected, and a source stops at the first page
+    that has nothing new on it. Collected postings are not marked seen here - the
+    caller does that once they are stored, so a failed write doesn't lose them.
+    """
+
+    def __init__(self, sources=None, quota=200, workers=8, seen=None, dedup=None):
+        self.sources = sources if sources is not None else all_sources()
+        self.quota = quota
+        self.workers = workers
+        self.seen = seen
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._jobs = []
+        self.known = []  # incremental runs: postings skipped because the seen index already had them
+        # across sources (and whatever the caller already has): same URL, or near-same title at the same company
+        self.dedup = dedup or Deduplicator()
+        self._per_source = {}
+        self._empty_after = {}  # source -> first page that came back empty
+
+    def _page(self, source, page):
+        if self.stop_event.is_set():
+            return source, page, None
+        # a page past one that was already empty won't have anything either
+        if page > self._empty_after.get(source.name, page):
+            return source, page, []
+        body = source.fetch_page(page)
+        if self.stop_event.is_set():
+            return source, page, None
+        jobs = source.read(body) if body else []
+        if jobs and self.seen is not None:
+            jobs, known = self.seen.split(jobs)
+            self.seen.mark(known)
+            with self._lock:
+                self.known.extend(known)
+            if not jobs:
+                logger.info(f"  {source.name} page {page}: nothing new - stopping")
+        if not jobs:
+            with self._lock:
+                self._empty_after[source.name] = min(self._empty_after.get(source.name, page), page)
+        return source, page, jobs
+
+    def _collect(self, source, jobs):
+        with self._lock:
+            for job in jobs:
+                if len(self._jobs) >= self.quota or self._per_source.get(source.name, 0) >= source.limit:
+                    break
+                if not self.dedup.add(job.title, job.company, job.url):
+                    continue
+                self._jobs.append(job)
+                self._per_source[source.name] = self._per_source.get(source.name, 0) + 1
+            if len(self._jobs) >= self.quota:
+                self.stop_event.set()
+
+    def run(self):
+        #-> list[JobRecord]
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="board")
+        if self.seen is None:
+            pending = {pool.submit(self._page, src, page)
+                       for src in self.sources for page in range(1, src.pages + 1)}
+        else:
+            # incremental: page n+1 is only fetched if page n had something new
+            pending = {pool.submit(self._page, src, 1) for src in self.sources}
+        try:
+            while pending and not self.stop_event.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    try:
+                        source, page, jobs = f.result()
+                    except Exception as e:
+                        logger.error(f"Board page failed: {e}")
+                        continue
+                    if jobs:
+                        self._collect(source, jobs)
+                        logger.info(f"  {source.name} page {page}: {len(jobs)} jobs (running total {len(self._jobs)})")
+                        if self.seen is not None and page < source.pages and not self.stop_event.is_set() \
+                                and self._per_source.get(source.name, 0) < source.limit:
+                            pending.add(pool.submit(self._page, source, page + 1))
+            if self.stop_event.is_set():
+                logger.info(f" Quota of {self.quota} reached - skipping remaining pages")
+            if self.dedup.duplicates:
+                logger.info(f" Dropped {self.dedup.duplicates} duplicate postings")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return self._jobs[: self.quota]
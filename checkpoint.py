@@ -0,0 +1,65 @@
+# checkpoint.py – durable journal of what each company has finished.
+# One JSON line per (company, stage) event, fsync'd as it's written, so a killed run
+# can be restarted with --resume and skip everything already done.
+
+
+import json
+import os
+import threading
+import time
+
+from enrichment_store import normalize_name
+from output_sink import trim_torn_line
+
+STAGES = ("enriched", "scraped", "written")
+
+
+class CheckpointJournal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}
+        if resume and os.path.exists(path):
+            self._load()
+            trim_torn_line(path)  # so the next event starts on a line of its own
+        self._fh = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # half-written last line from a crash (cut off before appending)
+                self._state.setdefault(event["key"], {})[event["stage"]] = event.get("data")
+
+    @staticmethod
+    def key(name):
+        return normalize_name(name)
+
+    def record(self, name, stage, data=None):
+        key = self.key(name)
+        line = json.dumps({"key": key, "stage": stage, "at": time.time(), "data": data}, ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._state.setdefault(key, {})[stage] = data
+
+    def done(self, name, stage):
+        return stage in self._state.get(self.key(name), {})
+
+    def data(self, name, stage):
+        return self._state.get(self.key(name), {}).get(stage)
+
+    def count(self, stage):
+        return sum(1 for stages in self._state.values() if stage in stages)
+
+    def total(self, stage):
+        #Sum of the numeric payloads recorded for a stage (e.g. jobs per written row)
+        return sum(stages[stage] or 0 for stages in self._state.values()
+                   if isinstance(stages.get(stage), (int, float)))
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
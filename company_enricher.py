@@ -2,48 +2,78 @@
 # It looks up sites and LinkedIn pages using DuckDuckGo, then guesses careers URLs.
 
 
-import requests
 import re
-import time
-import random
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, quote_plus
+import threading
+from urllib.parse import quote_plus
 import logging
 
+from fetcher import get_engine
+from html_parser import Document
+from ats_detect import detect_ats
+from link_classifier import default_classifier
+from metrics import get_metrics
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("enricher")
 
 DUCK_API = "https://api.duckduckgo.com/?q={query}&format=json"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
+# URL / page-source substring -> ATS platform name (as used by ats_clients and JobScraper)
+ATS_PATTERNS = {"lever.co": "lever", "greenhouse.io": "greenhouse", "workday": "workday", "ashbyhq": "ashby",
+                "smartrecruiters": "smartrecruiters", "bamboohr": "bamboohr", "recruitee": "recruitee",
+                "workable": "workable", "jobvite": "jobvite"}
 
 
 class CompanyEnricher:
     #Finds website, LinkedIn, careers, and job listings URLs for a company
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+    def __init__(self, fetcher=None, store=None, concurrent_probes=True, stop_event=None):
+        self.fetcher = fetcher or get_engine()
+        self.store = store
+        # set by the pipeline once it has enough jobs; lookups bail out early after that
+        self.stop_event = stop_event or threading.Event()
+        # fire TLD / careers-suffix guesses together (HEAD) instead of one full GET at a time
+        self.concurrent_probes = concurrent_probes
+        self.metrics = get_metrics()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def _first_reachable(self, urls):
+        if self.stopped:
+            return None
+        if self.concurrent_probes:
+            return self.fetcher.probe(urls)
+        for url in urls:
+            if self._get(url):
+                return url
+        return None
 
     def _get(self, url, timeout=12):
-        # basic GET call with retry; short delay to be polite
-        for _ in range(2):
-            try:
-                r = self.session.get(url, timeout=timeout)
-                if r.status_code == 200:
-                    return r.text
-            except Exception:
-                time.sleep(2)
-        return None
+        # basic GET call with retry (see fetcher.FetchEngine)
+        if self.stopped:
+            return None
+        return self.fetcher.get_text(url, timeout=timeout)
+
+    def _get_doc(self, url, docs=None, timeout=12):
+        # fetch once per company: pages already in docs are reused, new ones are added to it
+        if docs is not None and url in docs:
+            return docs[url]
+        if self.stopped:
+            return None
+        res = self.fetcher.fetch(url, timeout=timeout)
+        doc = Document(url, res.text, res.final_url) if res.status == 200 else None
+        if docs is not None and doc is not None:
+            docs[url] = doc
+        return doc
 
     def _search_api(self, query):
         #Use DuckDuckGo Instant Answer API
+        if self.stopped:
+            return []
         try:
             url = DUCK_API.format(query=quote_plus(query))
-            r = self.session.get(url, timeout=10)
-            data = r.json()
+            data = self.fetcher.fetch(url, timeout=10, retries=1).json()
             if data.get("AbstractURL"):
                 return [data["AbstractURL"]]
             related = [topic["FirstURL"] for topic in data.get("RelatedTopics", []) if "FirstURL" in topic]
@@ -51,23 +81,32 @@ class CompanyEnricher:
         except Exception:
             return []
 
-    def find_website(self, company):
-        #Try to find official website
+    def _lookup(self, field, func, *args):
+        # one field looked up for real (not from the store) - timed per field
+        self.metrics.inc("enrich_lookups_total", field=field)
+        with self.metrics.timer("lookup_seconds", field=field):
+            return func(*args)
+
+    # the *_scored helpers return (value, confidence) so the store knows how far to trust a hit
+
+    def _find_website_scored(self, company):
         logger.info(f" Searching website for {company}")
         results = self._search_api(f"{company} official website")
         for link in results:
             if not any(x in link for x in ["linkedin", "facebook", "glassdoor", "indeed"]):
                 logger.info(f"Found website: {link}")
-                return link
+                return link, 0.8
         # fallback guess
         slug = re.sub(r"[^a-z0-9]", "", company.lower())
-        for tld in ["com", "io", "org", "co", "ai"]:
-            guess = f"https://{slug}.{tld}"
-            html = self._get(guess)
-            if html:
-                logger.info(f"Guessed website: {guess}")
-                return guess
-        return None
+        guess = self._first_reachable(f"https://{slug}.{tld}" for tld in ["com", "io", "org", "co", "ai"])
+        if guess:
+            logger.info(f"Guessed website: {guess}")
+            return guess, 0.5
+        return None, 0.0
+
+    def find_website(self, company):
+        #Try to find official website
+        return self._find_website_scored(company)[0]
 
     def find_linkedin(self, company):
         #Find LinkedIn company page
@@ -77,42 +116,51 @@ class CompanyEnricher:
                 return link.split("?")[0]
         return None
 
+    def _find_careers_page_scored(self, website, docs=None):
+        if not website:
+            return None, 0.0
+        home = self._get_doc(website, docs)
+        if not home:
+            return None, 0.0
+
+        best = default_classifier().best(home, website, "careers")
+        if best:
+            return best[0][2], 0.8
+        test_url = self._first_reachable(website.rstrip("/") + suffix for suffix in ["/careers", "/jobs", "/join-us"])
+        if test_url:
+            return test_url, 0.6
+        return None, 0.0
+
     def find_careers_page(self, website):
         #Find /careers or /jobs link on site
-        if not website:
-            return None
-        html = self._get(website)
-        if not html:
-            return None
+        return self._find_careers_page_scored(website)[0]
 
-        soup = BeautifulSoup(html, "html.parser")
-        for a in soup.find_all("a", href=True):
-            text = a.get_text(strip=True).lower()
-            if any(kw in text for kw in ["career", "job", "join", "work with"]):
-                return urljoin(website, a["href"])
-        for suffix in ["/careers", "/jobs", "/join-us"]:
-            test_url = website.rstrip("/") + suffix
-            if self._get(test_url):
-                return test_url
-        return None
+    def _detect_job_board_scored(self, url, docs=None):
+        if not url:
+            return None, 0.0
+        if any(p in url for p in ATS_PATTERNS):
+            target = detect_ats(url)
+            return (target.board_url if target else url), 0.9
+        doc = self._get_doc(url, docs)
+        if doc:
+            # redirect target / embedded board -> canonical board URL the scraper can read as JSON
+            target = detect_ats(url, doc)
+            if target:
+                return target.board_url, 0.8
+            for p, platform in ATS_PATTERNS.items():
+                if p in doc.text:
+                    doc.platform = platform  # the scraper picks its HTML parser by this
+                    return url, 0.7
+        return None, 0.0
 
     def detect_job_board(self, url):
         #Detect if site uses known ATS (Lever, Greenhouse, etc.)
-        if not url:
-            return None
-        patterns = ["lever.co", "greenhouse.io", "workday", "ashbyhq", "smartrecruiters",
-                    "bamboohr", "recruitee", "workable", "jobvite"]
-        if any(p in url for p in patterns):
-            return url
-        html = self._get(url)
-        if html:
-            for p in patterns:
-                if p in html:
-                    return url
-        return None
+        return self._detect_job_board_scored(url)[0]
 
     def enrich_company(self, name, desc=""):
-        #Main entry
+        #Main entry. data["docs"] holds the pages fetched on the way ({url: Document}) so the
+        #scraper can reuse them; it isn't serialisable, so pop it before saving data anywhere.
+        docs = {}
         data = {
             "company_name": name,
             "company_description": desc,
@@ -120,11 +168,63 @@ class CompanyEnricher:
             "linkedin": None,
             "careers_page": None,
             "job_listings_url": None,
+            "docs": docs,
         }
 
-        website = self.find_website(name)
+        if self.stopped:
+            return data
+        known = self.store.get(name) if self.store else {}
+        updates = {}
+
+        def cached(field):
+            rec = known.get(field)
+            return rec is not None and rec.is_fresh(field)
+
+        def looked_up(field, value, conf, keep=True):
+            # a re-lookup that comes back empty (search glitch, rate limit) keeps the last good
+            # value - with its timestamp refreshed and its confidence halved - instead of
+            # overwriting it with a miss; keep=False when the field it came from has changed
+            rec = known.get(field)
+            if not value and keep and rec is not None and rec.value:
+                value, conf = rec.value, rec.confidence / 2
+            updates[field] = (value, conf)
+            return value
+
+        def changed(field):
+            return field in updates and (known.get(field) is None or known[field].value != updates[field][0])
+
+        # each field is only looked up again when its own record is stale or missing,
+        # or when the field it was derived from just changed
+        if cached("website"):
+            website = known["website"].value
+        else:
+            website = looked_up("website", *self._lookup("website", self._find_website_scored, name))
+        website_changed = changed("website")
+
+        if cached("linkedin"):
+            data["linkedin"] = known["linkedin"].value
+        else:
+            linkedin = self._lookup("linkedin", self.find_linkedin, name)
+            data["linkedin"] = looked_up("linkedin", linkedin, 0.9 if linkedin else 0.0)
+
+        if cached("careers_page") and not website_changed:
+            data["careers_page"] = known["careers_page"].value
+        else:
+            data["careers_page"] = looked_up(
+                "careers_page", *self._lookup("careers_page", self._find_careers_page_scored, website, docs),
+                keep=not website_changed)
+
+        if cached("job_listings_url") and "careers_page" not in updates:
+            data["job_listings_url"] = known["job_listings_url"].value
+        else:
+            data["job_listings_url"] = looked_up(
+                "job_listings_url", *self._lookup("job_listings_url", self._detect_job_board_scored,
+                                                  data["careers_page"], docs),
+                keep=not changed("careers_page"))
+
         data["website"] = website or ""
-        data["linkedin"] = self.find_linkedin(name)
-        data["careers_page"] = self.find_careers_page(website)
-        data["job_listings_url"] = self.detect_job_board(data["careers_page"])
+        self.metrics.inc("companies_enriched_total")
+        # a stop mid-way leaves misses that aren't real - don't remember them
+        if self.store and updates and not self.stopped:
+            self.store.put(name, updates)
         return data
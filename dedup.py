@@ -0,0 +1,180 @@
+# dedup.py – cross-source job de-duplication.
+# Two postings are the same job if their canonical URLs match (tracking parameters,
+# trailing slashes, www. and ATS mirror hosts stripped) or if they are at the same
+# (normalized) company with nearly identical titles - the fuzzy match only applies across
+# hosts (a board listing vs the company's ATS) or when one side has no URL, since two
+# URLs on the same host are two separate postings. The fuzzy check uses MinHash
+# signatures bucketed by LSH bands, so each new posting is only compared with the
+# handful of postings that share a bucket with it - never pairwise with everything
+# collected so far.
+
+
+import re
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from enrichment_store import normalize_name
+
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer", "source", "src",
+    "gh_src", "lever-source", "lever-origin", "utm", "trk", "trackingid", "refid", "_hsenc", "_hsmi",
+}
+
+# the same ATS posting under different hosts/paths -> one canonical URL
+ATS_MIRRORS = [
+    # boards.greenhouse.io/x/jobs/1, job-boards(.eu).greenhouse.io/x/jobs/1
+    (re.compile(r"^(?:job-)?boards(?:\.eu)?\.greenhouse\.io/([\w.-]+)/jobs/(\d+)"),
+     "https://boards.greenhouse.io/{0}/jobs/{1}"),
+    # jobs(.eu).lever.co/x/<id>(/apply)
+    (re.compile(r"^jobs(?:\.eu)?\.lever\.co/([\w.-]+)/([0-9a-f-]{36})"), "https://jobs.lever.co/{0}/{1}"),
+    # jobs.ashbyhq.com/x/<id>(/application)
+    (re.compile(r"^jobs\.ashbyhq\.com/([\w.%-]+)/([0-9a-f-]{36})"), "https://jobs.ashbyhq.com/{0}/{1}"),
+    # apply.workable.com/x/j/<id>(/apply)
+    (re.compile(r"^apply\.workable\.com/([\w-]+)/j/(\w+)"), "https://apply.workable.com/{0}/j/{1}"),
+]
+
+
+def canonical_url(url):
+    #Same posting, same string: https, lower-case host without www., no fragment,
+    #no tracking parameters, sorted query, no trailing slash, ATS mirrors folded together
+    if not url:
+        return ""
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    # greenhouse embed: /embed/job_app?for=x&token=1 is boards.greenhouse.io/x/jobs/1
+    if host.endswith("greenhouse.io") and "/embed/" in parts.path and "for" in query and "token" in query:
+        return f"https://boards.greenhouse.io/{query['for']}/jobs/{query['token']}"
+    path = parts.path.rstrip("/")
+    for pattern, template in ATS_MIRRORS:
+        m = pattern.match(host + path)
+        if m:
+            return template.format(*m.groups())
+    kept = sorted((k, v) for k, v in query.items()
+                  if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_"))
+    return urlunsplit(("https", host, path or "/", urlencode(kept), ""))
+
+
+def url_host(key):
+    #Host of a canonical URL ("" for no URL)
+    return urlsplit(key).hostname or "" if key else ""
+
+
+def _normalize_text(text):
+    # letters and digits of any script ("软件工程师" shingles as well as "engineer")
+    return " ".join(re.sub(r"[\W_]", " ", str(text).lower()).split())
+
+
+def shingles(text, k=3):
+    #Character k-grams of the normalized text
+    text = _normalize_text(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+_PRIME = (1 << 31) - 1
+
+
+class MinHasher:
+    def __init__(self, num_perm=64, seed=7):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, shingle_set):
+        # one hash per shingle, then num_perm universal-hash permutations in a single numpy op
+        h = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingle_set),
+                        dtype=np.uint64, count=len(shingle_set))
+        return ((self._a[:, None] * h[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+
+class Deduplicator:
+    """
+    Streaming de-duplicator. add() returns True for a posting we haven't seen and
+    remembers it, False for a duplicate (same canonical URL, or the same company and a
+    title whose shingle Jaccard similarity with an earlier posting's is >= threshold,
+    where the two postings are on different hosts or one of them has no URL).
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=8):
+        assert num_perm % bands == 0
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._urls = set()
+        self._buckets = {}   # (band, band hash) -> [posting ids]
+        self._shingles = []  # posting id -> shingle set
+        self._hosts = []     # posting id -> host of its canonical URL ("" if none)
+        self.duplicates = 0
+
+    def _band_keys(self, sig, company_key):
+        # buckets are per company, so only postings of the same company are ever compared
+        return [(i, company_key.encode("utf-8") + b"\0" + sig[i * self.rows:(i + 1) * self.rows].tobytes())
+                for i in range(self.bands)]
+
+    def fingerprint(self, title, company):
+        #(title shingles, per-company LSH band keys) for fuzzy matching, or None if there's nothing to match on
+        company_key = normalize_name(company or "")
+        # without a real company name, a title alone ("Software Engineer") says nothing
+        if not title or company_key in ("", "unknown", "unknown company"):
+            return None
+        sh = shingles(title)
+        if not sh:
+            return None  # nothing but punctuation ("—")
+        return sh, self._band_keys(self.hasher.signature(sh), company_key)
+
+    def add(self, title, company, url=None):
+        key = canonical_url(url) if url else ""
+        if key and key in self._urls:
+            self.duplicates += 1
+            return False
+        fp = self.fingerprint(title, company)
+        if fp is not None:
+            sh, bands = fp
+            host = url_host(key)
+            candidates = set()
+            for band in bands:
+                candidates.update(self._buckets.get(band, ()))
+            # same host, different URL: e.g. two "Software Engineer" openings on one ATS board
+            candidates = [c for c in candidates if not host or not self._hosts[c] or self._hosts[c] != host]
+            if any(jaccard(sh, self._shingles[c]) >= self.threshold for c in candidates):
+                self.duplicates += 1
+                if key:
+                    self._urls.add(key)
+                return False
+            pid = len(self._shingles)
+            self._shingles.append(sh)
+            self._hosts.append(host)
+            for band in bands:
+                self._buckets.setdefault(band, []).append(pid)
+        if key:
+            self._urls.add(key)
+        return True
+
+    def add_row(self, row):
+        #Long output row (output_sink.ROW_COLUMNS); rows without a job are always "new"
+        title, url = row.get("job title"), row.get("job URL")
+        if not _present(title) and not _present(url):
+            return True
+        company = row.get("Company Name") if _present(row.get("Company Name")) else ""
+        return self.add(title if _present(title) else "", company, url if _present(url) else None)
+
+
+def _present(value):
+    # cells read back through pandas come in as NaN when empty
+    return isinstance(value, str) and value.strip() != ""
+
@@ -0,0 +1,100 @@
+# enrichment_store.py – remembers what CompanyEnricher found between runs.
+# One row per (company, field) with the value, when it was found and how sure we are,
+# so enrich_company only redoes the lookups that went stale or never succeeded.
+
+
+import re
+import sqlite3
+import threading
+import time
+
+STORE_FILE = ".enrichment_store.sqlite"
+
+DAY = 24 * 3600
+# how long a found value stays good, per field
+FIELD_TTLS = {
+    "website": 30 * DAY,
+    "linkedin": 30 * DAY,
+    "careers_page": 14 * DAY,
+    "job_listings_url": 7 * DAY,
+}
+# misses are retried sooner than hits
+NEGATIVE_TTL = 3 * DAY
+
+SUFFIXES = {"inc", "incorporated", "ltd", "llc", "gmbh", "corp", "corporation", "co", "company",
+            "plc", "sa", "ag", "bv", "pbc"}
+
+
+def normalize_name(name):
+    #"Sweep, Inc." -> "sweep"
+    words = re.sub(r"[^a-z0-9 ]", " ", str(name).lower()).split()
+    while len(words) > 1 and words[-1] in SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+class FieldRecord:
+    def __init__(self, value, fetched_at, confidence):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.confidence = confidence
+
+    def is_fresh(self, field, now=None):
+        ttl = FIELD_TTLS.get(field, 7 * DAY) if self.value else NEGATIVE_TTL
+        return (now or time.time()) - self.fetched_at < ttl
+
+
+class EnrichmentStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS enrichment (
+                company_key TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT,
+                fetched_at REAL NOT NULL,
+                confidence REAL NOT NULL,
+                PRIMARY KEY (company_key, field)
+            )""")
+        self._db.commit()
+        self._rows = None
+
+    def warm_start(self):
+        #Load the whole store with one query; later lookups are dict reads
+        with self._lock:
+            rows = {}
+            for key, field, value, fetched_at, conf in self._db.execute(
+                    "SELECT company_key, field, value, fetched_at, confidence FROM enrichment"):
+                rows.setdefault(key, {})[field] = FieldRecord(value, fetched_at, conf)
+            self._rows = rows
+            return len(rows)
+
+    def get(self, name):
+        if self._rows is None:
+            self.warm_start()
+        with self._lock:
+            return dict(self._rows.get(normalize_name(name), {}))
+
+    def put(self, name, fields):
+        #fields: {field: (value, confidence)}
+        if not fields:
+            return
+        key = normalize_name(name)
+        now = time.time()
+        if self._rows is None:
+            self.warm_start()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO enrichment(company_key, field, value, fetched_at, confidence) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, f, v or None, now, c) for f, (v, c) in fields.items()])
+            row = self._rows.setdefault(key, {})
+            for f, (v, c) in fields.items():
+                row[f] = FieldRecord(v or None, now, c)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -3,43 +3,35 @@
 #Merges results automatically into climate_jobs_output.xlsx.
 
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
+import json
+import os
 import re
 from urllib.parse import urljoin
 import logging
 from datetime import datetime
 
+from html_parser import make_soup
+from board_sources import REGISTRY, JobRecord, register
+from seen_index import SeenIndex
+from metrics import get_metrics
+from job_store import JobStore
+from output_sink import to_long
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("ExtraBoards")
 
 OUTPUT_FILE = "climate_jobs_output.xlsx"
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-}
+# job store the workbook is exported from (the same one main.py writes to)
+STORE_FILE = os.path.splitext(OUTPUT_FILE)[0] + ".jobs.sqlite"
 
 
-def safe_get(url):
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
-        if r.status_code == 200:
-            return r.text
-    except Exception:
-        pass
-    return None
-
-
-def scrape_greenjobs():
-    #Scrape greenjobsearch.org (clean HTML structure)
-    base = "https://www.greenjobsearch.org/job-category/climate-change-jobs/"
-    html = safe_get(base)
+@register("GreenJobSearch", "https://www.greenjobsearch.org/job-category/climate-change-jobs/",
+          limit=80, retries=1)
+def parse_greenjobs(html):
+    #greenjobsearch.org (clean HTML structure)
     jobs = []
-    if not html:
-        return jobs
-
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     cards = soup.find_all("article", class_=re.compile("job_listing"))
     for card in cards[:80]:
         a = card.find("a", href=True)
@@ -51,104 +43,103 @@ def scrape_greenjobs():
         company = company.get_text(strip=True) if company else "Unknown"
         location = card.find("div", class_="location")
         location = location.get_text(strip=True) if location else "Remote"
-        jobs.append({
-            "Company Name": company,
-            "Company Description": "From GreenJobSearch",
-            "Website URL": "",
-            "LinkedIn URL": "",
-            "Careers Page URL": link,
-            "Job listings page URL": link,
-            "job post1 title": title,
-            "job post1 URL": link,
-            "job post1 location": location,
-        })
-    logger.info(f" GreenJobSearch: {len(jobs)} jobs")
+        jobs.append(JobRecord(title, company, location, link, "GreenJobSearch"))
     return jobs
 
 
-def scrape_remotive():
-    #Use Remotive public API (remote job board)
-    jobs = []
+@register("Remotive", "https://remotive.com/api/remote-jobs?category=software-dev", limit=80, retries=1)
+def parse_remotive(text):
+    #Remotive public API (remote job board)
     try:
-        resp = requests.get("https://remotive.com/api/remote-jobs?category=software-dev")
-        data = resp.json().get("jobs", [])
-        for j in data[:80]:
-            jobs.append({
-                "Company Name": j["company_name"],
-                "Company Description": "From Remotive API",
-                "Website URL": "",
-                "LinkedIn URL": "",
-                "Careers Page URL": j["url"],
-                "Job listings page URL": j["url"],
-                "job post1 title": j["title"],
-                "job post1 URL": j["url"],
-                "job post1 location": j.get("candidate_required_location", "Remote")
-            })
-        logger.info(f" Remotive API: {len(jobs)} jobs")
-    except Exception as e:
+        data = json.loads(text)
+    except ValueError as e:
         logger.warning(f"Remotive failed: {e}")
+        return []
+    items = data.get("jobs") if isinstance(data, dict) else None
+    jobs = []
+    for j in (items if isinstance(items, list) else [])[:80]:
+        if not isinstance(j, dict) or not j.get("title") or not j.get("url"):
+            continue  # incomplete item - skip it, keep the rest
+        jobs.append(JobRecord(j["title"], j.get("company_name"), j.get("candidate_required_location") or "Remote",
+                              j["url"], "Remotive API"))
     return jobs
 
 
-def scrape_climatepeople():
-    #Scrape ClimatePeople.com jobs
-    base = "https://www.climatepeople.com/jobs"
-    html = safe_get(base)
-    jobs = []
-    if not html:
-        return jobs
-
-    soup = BeautifulSoup(html, "html.parser")
+@register("ClimatePeople", "https://www.climatepeople.com/jobs", limit=60, retries=1)
+def parse_climatepeople(html):
+    #ClimatePeople.com jobs
+    soup = make_soup(html)
     posts = soup.find_all("a", href=re.compile("/job/"))
-    for a in posts[:60]:
-        title = a.get_text(strip=True)
-        link = urljoin(base, a["href"])
-        jobs.append({
-            "Company Name": "ClimatePeople",
-            "Company Description": "From ClimatePeople.com",
-            "Website URL": "",
-            "LinkedIn URL": "",
-            "Careers Page URL": link,
-            "Job listings page URL": link,
-            "job post1 title": title,
-            "job post1 URL": link,
-            "job post1 location": "Remote"
-        })
-    logger.info(f" ClimatePeople: {len(jobs)} jobs")
+    return [JobRecord(a.get_text(strip=True), "ClimatePeople", "Remote",
+                      urljoin("https://www.climatepeople.com/jobs", a["href"]), "ClimatePeople.com")
+            for a in posts[:60]]
+
+
+def _scrape_source(name, seen=None):
+    # one registered source -> JobRecords (only new/changed ones with a SeenIndex)
+    jobs = REGISTRY[name].scrape(seen)
+    logger.info(f" {name}: {len(jobs)} jobs")
     return jobs
 
 
+def scrape_greenjobs(seen=None):
+    return [job.to_row() for job in _scrape_source("GreenJobSearch", seen)]
+
+
+def scrape_remotive(seen=None):
+    return [job.to_row() for job in _scrape_source("Remotive", seen)]
+
+
+def scrape_climatepeople(seen=None):
+    return [job.to_row() for job in _scrape_source("ClimatePeople", seen)]
+
+
 def merge_to_excel(jobs):
-    #Append new jobs to existing Excel file
-    df_new = pd.DataFrame(jobs)
+    #Upsert new jobs into the job store behind the workbook, then re-export the workbook from it;
+    #returns False if that failed (the jobs then only go to extra_jobs_backup.xlsx)
     try:
-        existing = pd.read_excel(OUTPUT_FILE, sheet_name="Data")
-        combined = pd.concat([existing, df_new], ignore_index=True)
-        with pd.ExcelWriter(OUTPUT_FILE, engine="openpyxl") as w:
-            combined.to_excel(w, sheet_name="Data", index=False)
-            method_df = pd.DataFrame([
-                {"Step": "Added extra jobs", "Description": f"Merged {len(jobs)} new jobs from open boards on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"}
-            ])
-            method_df.to_excel(w, sheet_name="Methodology", index=False)
-        logger.info(f" Merged {len(jobs)} new jobs into {OUTPUT_FILE}")
+        store = JobStore(STORE_FILE)
+        if store.count() == 0 and os.path.exists(OUTPUT_FILE):
+            # workbook from before the job store existed: import it (and its Methodology) once
+            sheets = pd.read_excel(OUTPUT_FILE, sheet_name=None, dtype=str)
+            method = sheets.get("Methodology", pd.DataFrame()).fillna("")
+            store.begin_run([{"Step": r.get("Step", ""), "Notes": r.get("Notes", r.get("Description", ""))}
+                             for r in method.to_dict("records")])
+            store.upsert(to_long(sheets.get("Data", pd.DataFrame())).to_dict("records"), source="workbook")
+        # same posting URL, or near-same title at the same company, updates the stored posting
+        added, known = store.upsert(jobs, source="extra_boards")
+        if known:
+            logger.info(f" Skipped {known} jobs already in {OUTPUT_FILE}")
+        store.add_methodology("Added extra jobs", f"Merged {added} new jobs from open boards on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        store.export_xlsx(OUTPUT_FILE)
+        store.close()
+        logger.info(f" Merged {added} new jobs into {OUTPUT_FILE}")
+        return True
     except Exception as e:
         logger.error(f"Failed to merge: {e}")
-        df_new.to_excel("extra_jobs_backup.xlsx", index=False)
+        pd.DataFrame(jobs).to_excel("extra_jobs_backup.xlsx", index=False)
         logger.info(" Saved to extra_jobs_backup.xlsx as fallback")
+        return False
 
 
 def main():
     logger.info(" Starting additional board scraping...")
-    all_jobs = []
-    all_jobs.extend(scrape_greenjobs())
-    all_jobs.extend(scrape_remotive())
-    all_jobs.extend(scrape_climatepeople())
+    # postings merged on an earlier run are already in the workbook - only add new ones
+    seen = SeenIndex()
+    records = []
+    for name in ("GreenJobSearch", "Remotive", "ClimatePeople"):
+        records.extend(_scrape_source(name, seen))
+    all_jobs = [job.to_row() for job in records]
 
     if all_jobs:
-        merge_to_excel(all_jobs)
+        # marked seen only once they're in the store - a failed merge gets them again next run
+        if merge_to_excel(all_jobs):
+            seen.mark(records)
         logger.info(f" Total new jobs added: {len(all_jobs)}")
     else:
         logger.warning("No extra jobs found.")
+    seen.close()
+    get_metrics().log_summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,320 @@
+# fetcher.py – shared HTTP engine used by every scraper in the project.
+# One place to set global concurrency, per-host politeness, response caching and
+# connection pooling, plus per-host request metrics (see metrics.py). Blocking helpers for the thread-based code and an asyncio
+# front-end (afetch / fetch_all) for the async pipeline.
+
+
+import asyncio
+import sqlite3
+import threading
+import time
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from http_client import make_client, connection_stats, install_dns_cache
+from rate_limiter import HostRateLimiter, host_of
+from http_cache import HttpCache
+from retry_policy import (RetryPolicy, CircuitBreaker, LatencyTracker, CircuitOpenError, HostUnreachableError,
+                          host_unreachable)
+from metrics import get_metrics
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+logger = logging.getLogger("fetcher")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+DEFAULT_CONCURRENCY = 32
+# how long a host that failed DNS / TCP connect is skipped without trying again
+UNREACHABLE_TTL = 15 * 60
+
+
+class FetchResult:
+    #What a fetch hands back - keeps callers off requests.Response
+
+    def __init__(self, url, status=0, text="", headers=None, final_url=None, elapsed=0.0, error=None,
+                 from_cache=False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers or {}
+        self.final_url = final_url or url
+        self.elapsed = elapsed
+        self.error = error
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return self.error is None and 0 < self.status < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def __repr__(self):
+        return f"FetchResult({self.url!r}, status={self.status})"
+
+
+class FetchEngine:
+    #Shared requests.Session + global concurrency limit + per-host rate limits
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=12, retries=2, headers=None,
+                 limiter=None, cache=None, host_pool_sizes=None, http2=False, dns_cache=True,
+                 policy=None, breaker=None, metrics=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        # keep-alive pools sized to our concurrency (see http_client for per-host sizes / HTTP/2)
+        self.session = make_client(concurrency, host_pool_sizes, headers or HEADERS, http2=http2)
+        self.dns_cache = install_dns_cache() if dns_cache else None
+        self.limiter = limiter or HostRateLimiter()
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.metrics = metrics or get_metrics()
+        self.cache = cache
+        self._url_locks = {}
+        self._url_locks_guard = threading.Lock()
+        self._unreachable = {}
+        self._probe_executor = None
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _url_lock(self, url):
+        with self._url_locks_guard:
+            lock = self._url_locks.get(url)
+            if lock is None:
+                lock = self._url_locks[url] = threading.Lock()
+            return lock
+
+    def fetch(self, url, method="GET", timeout=None, headers=None, retries=None,
+              allow_redirects=True, use_cache=True, **kwargs):
+        """Blocking request with retries (see retry_policy). Always returns a FetchResult (status 0 + error on failure)."""
+        if self.cache is None or not use_cache or method != "GET" or kwargs:
+            return self._fetch_network(url, method, timeout, headers, retries, allow_redirects, **kwargs)
+
+        # one fetch per URL at a time, so a duplicate request made while the first
+        # is still in flight waits and then reads the cache instead of refetching
+        with self._url_lock(url):
+            entry = self._cache_call(self.cache.get, url)
+            if entry is not None and self.cache.is_fresh(entry, host_of(url)):
+                self.metrics.inc("http_cache_total", result="hit")
+                return self._from_entry(entry)
+            req_headers = dict(headers or {})
+            if entry is not None:
+                req_headers.update(entry.validators())
+            res = self._fetch_network(url, method, timeout, req_headers or None, retries, allow_redirects)
+            if res.status == 304 and entry is not None:
+                self.metrics.inc("http_cache_total", result="revalidated")
+                self._cache_call(self.cache.refresh, url)
+                return self._from_entry(entry)
+            self.metrics.inc("http_cache_total", result="miss")
+            if res.status == 200:
+                self._cache_call(self.cache.put, url, res.status, res.text, res.headers, res.final_url)
+            return res
+
+    def _cache_call(self, func, *args):
+        # the cache file is shared with other processes (e.g. extra_boards.py next to main.py);
+        # if it's locked or broken, carry on as a cache miss rather than failing the fetch
+        try:
+            return func(*args)
+        except sqlite3.Error as e:
+            logger.debug(f"HTTP cache unavailable ({func.__name__}): {e}")
+            self.metrics.inc("http_cache_errors_total")
+            return None
+
+    def _from_entry(self, entry):
+        headers = {"Content-Type": entry.content_type} if entry.content_type else {}
+        return FetchResult(entry.url, entry.status, entry.text, headers, entry.final_url, from_cache=True)
+
+    def is_unreachable(self, url):
+        #True while a recent DNS/connect failure for this host is remembered
+        host = host_of(url)
+        until = self._unreachable.get(host)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            self._unreachable.pop(host, None)
+            return False
+        return True
+
+    def _fetch_network(self, url, method, timeout, headers, retries, allow_redirects, **kwargs):
+        tries = max(self.retries if retries is None else retries, 1)
+        host = host_of(url)
+        if self.is_unreachable(url):
+            self.metrics.inc("http_skipped_total", reason="unreachable")
+            return FetchResult(url, error=HostUnreachableError(f"{host} unreachable (cached)"))
+        if not self.breaker.allow(host):
+            self.metrics.inc("http_skipped_total", reason="circuit_open")
+            return FetchResult(url, error=CircuitOpenError(f"{host} circuit open"))
+        result = FetchResult(url, error=RuntimeError("no attempt made"))
+        for attempt in range(tries):
+            # wait for the host's token before taking a global slot, so a throttled
+            # host never holds up requests to other hosts
+            self.limiter.acquire(url)
+            start = time.monotonic()
+            try:
+                with self._slots:
+                    r = self.session.request(method, url,
+                                             timeout=self.latency.timeout_for(host, timeout or self.timeout),
+                                             headers=headers, allow_redirects=allow_redirects, **kwargs)
+                elapsed = time.monotonic() - start
+                self.latency.observe(host, elapsed)
+                self.metrics.observe("http_request_seconds", elapsed, host=host)
+                self.metrics.inc("http_requests_total", host=host, status=f"{r.status_code // 100}xx")
+                self.metrics.inc("http_bytes_total", len(r.content), host=host)
+                result = FetchResult(url, r.status_code, r.text, r.headers, r.url, elapsed)
+                if not self.policy.should_retry_status(r.status_code):
+                    # 2xx-4xx: the host is alive, and a 404 won't turn into a 200 on retry
+                    self.breaker.record(host, ok=True)
+                    return result
+                self.breaker.record(host, ok=False)
+                delay = self.policy.delay(attempt, r.headers.get("Retry-After"))
+            except Exception as e:
+                logger.debug(f"Request failed ({attempt + 1}/{tries}): {url} - {e}")
+                result = FetchResult(url, elapsed=time.monotonic() - start, error=e)
+                self.metrics.inc("http_errors_total", host=host, error=type(e).__name__)
+                self.breaker.record(host, ok=False)
+                if host_unreachable(e):
+                    # DNS / connect failure: retrying won't help, and nor will the next request
+                    self._unreachable[host] = time.monotonic() + UNREACHABLE_TTL
+                    break
+                delay = self.policy.delay(attempt) if self.policy.retryable_error(e) else None
+            if delay is None or attempt + 1 >= tries or not self.breaker.allow(host):
+                break
+            self.metrics.inc("http_retries_total", host=host)
+            time.sleep(delay)
+        return result
+
+    def get_text(self, url, timeout=None, retries=None):
+        #Body of a 200 response, else None (what the old _get helpers returned)
+        res = self.fetch(url, timeout=timeout, retries=retries)
+        if res.status == 200:
+            return res.text
+        return None
+
+    def get_json(self, url, timeout=None, retries=None):
+        res = self.fetch(url, timeout=timeout, retries=retries)
+        if res.status != 200:
+            return None
+        try:
+            return res.json()
+        except ValueError:
+            return None
+
+    # --- candidate probing ------------------------------------------------
+
+    def _probe_pool(self):
+        # separate from the run_blocking pool so probes started from inside a
+        # pipeline worker can never wait on their own pool
+        with self._executor_lock:
+            if self._probe_executor is None:
+                self._probe_executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                          thread_name_prefix="probe")
+            return self._probe_executor
+
+    def _probe_one(self, url, timeout):
+        res = self.fetch(url, method="HEAD", timeout=timeout, retries=1)
+        if res.status == 200:
+            return True
+        if res.status in (403, 405, 501):
+            # some servers refuse HEAD - ask for the first KB instead of the whole page
+            res = self.fetch(url, timeout=timeout, retries=1, use_cache=False,
+                             headers={"Range": "bytes=0-1023"})
+            return res.status in (200, 206)
+        return False
+
+    def probe(self, urls, timeout=6):
+        """Check candidate URLs all at once; return the first one (in list order) that answers 200, else None."""
+        urls = list(urls)
+        if not urls:
+            return None
+        pool = self._probe_pool()
+        futures = [pool.submit(self._probe_one, u, timeout) for u in urls]
+        try:
+            # walk in priority order: a later hit only wins once every earlier candidate failed
+            for url, fut in zip(urls, futures):
+                try:
+                    if fut.result():
+                        return url
+                except Exception as e:
+                    logger.debug(f"Probe failed: {url} - {e}")
+            return None
+        finally:
+            for f in futures:
+                f.cancel()
+
+    # --- asyncio front-end -------------------------------------------------
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                    thread_name_prefix="fetch")
+            return self._executor
+
+    async def run_blocking(self, func, *args, **kwargs):
+        #Run any blocking call on the engine's pool (used for whole process_company calls too)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), partial(func, *args, **kwargs))
+
+    async def afetch(self, url, **kwargs):
+        return await self.run_blocking(self.fetch, url, **kwargs)
+
+    async def aget_text(self, url, **kwargs):
+        return await self.run_blocking(self.get_text, url, **kwargs)
+
+    async def fetch_all(self, urls, **kwargs):
+        #Fetch many URLs at once; results come back in input order
+        return await asyncio.gather(*(self.afetch(u, **kwargs) for u in urls))
+
+    def stats(self):
+        #Connection reuse + DNS cache numbers, for the end-of-run log
+        out = connection_stats(self.session)
+        if self.dns_cache is not None:
+            out.update(self.dns_cache.stats())
+        out["open_circuits"] = len(self.breaker.open_hosts())
+        out["unreachable_hosts"] = len(self._unreachable)
+        return out
+
+    def log_stats(self):
+        st = self.stats()
+        logger.info(" HTTP: " + ", ".join(f"{k}={v}" for k, v in st.items()))
+
+    def close(self):
+        for pool in (self._executor, self._probe_executor):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._probe_executor = None
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    #Process-wide engine; every module goes through this one
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine(cache=HttpCache())
+        return _engine
+
+
+def configure(**kwargs):
+    #Swap the shared engine, e.g. configure(concurrency=64) before starting a run;
+    #configure(cache=None) turns the response cache off
+    global _engine
+    kwargs.setdefault("cache", HttpCache())
+    with _engine_lock:
+        old, _engine = _engine, FetchEngine(**kwargs)
+    if old is not None:
+        old.close()
+    return _engine
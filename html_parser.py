@@ -0,0 +1,104 @@
+# html_parser.py – one place that decides how HTML gets parsed.
+# make_soup() hands back a BeautifulSoup tree (so all existing find_all/select calls keep
+# working) but built with the fastest tree builder installed - lxml by default, which is
+# C code and several times quicker than the pure-Python "html.parser".
+# iter_links() is a fast path for code that only needs <a href> + text; it uses
+# selectolax when that's installed.
+# Document carries a fetched page (body + lazily parsed tree) between the enricher and
+# the scraper so the same URL is never downloaded or parsed twice for one company.
+
+
+import logging
+import threading
+
+from bs4 import BeautifulSoup
+
+from metrics import get_metrics
+
+logger = logging.getLogger("html_parser")
+
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    _SelectolaxParser = None
+    HAVE_SELECTOLAX = False
+
+# BeautifulSoup tree builders, fastest first
+SOUP_BACKENDS = ["lxml", "html.parser", "html5lib"]
+DEFAULT_BACKEND = "lxml" if HAVE_LXML else "html.parser"
+
+
+def available_backends():
+    names = [b for b in SOUP_BACKENDS if b != "lxml" or HAVE_LXML]
+    try:
+        import html5lib  # noqa: F401
+    except ImportError:
+        names.remove("html5lib")
+    if HAVE_SELECTOLAX:
+        names.append("selectolax")
+    return names
+
+
+def make_soup(html, backend=None):
+    #Parse a page into a BeautifulSoup tree with the chosen (or default) builder
+    backend = backend or DEFAULT_BACKEND
+    with get_metrics().timer("html_parse_seconds", backend=backend):
+        return BeautifulSoup(html or "", backend)
+
+
+class Document:
+    #A fetched page: body, where it ended up after redirects, and a tree parsed on first use
+
+    def __init__(self, url, text, final_url=None, platform=None):
+        self.url = url
+        self.text = text or ""
+        self.final_url = final_url or url
+        # ATS detected on this page, if any (set by CompanyEnricher.detect_job_board and
+        # ats_detect); JobBoardScraper picks its HTML parser by it
+        self.platform = platform
+        self._soup = None
+        self._lock = threading.Lock()
+
+    @property
+    def parsed(self):
+        return self._soup is not None
+
+    @property
+    def soup(self):
+        with self._lock:
+            if self._soup is None:
+                self._soup = make_soup(self.text)
+            return self._soup
+
+    def __repr__(self):
+        return f"Document({self.url!r}, {len(self.text)} chars)"
+
+
+def iter_links(html, backend=None):
+    #Yield (href, text) for every <a href> in the page (html may be a str, soup or Document)
+    if isinstance(html, Document):
+        # reuse the tree if someone already parsed it, otherwise take the fast path on the text
+        if html.parsed or not HAVE_SELECTOLAX or backend not in (None, "selectolax"):
+            html = html.soup
+        else:
+            html = html.text
+    if isinstance(html, BeautifulSoup):
+        for a in html.find_all("a", href=True):
+            yield a["href"], a.get_text(strip=True)
+        return
+    if (backend or ("selectolax" if HAVE_SELECTOLAX else None)) == "selectolax":
+        with get_metrics().timer("html_parse_seconds", backend="selectolax"):
+            tree = _SelectolaxParser(html or "")
+        for node in tree.css("a[href]"):
+            yield node.attributes.get("href") or "", node.text(strip=True)
+        return
+    soup = make_soup(html, backend)
+    for a in soup.find_all("a", href=True):
+        yield a["href"], a.get_text(strip=True)
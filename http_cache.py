@@ -0,0 +1,188 @@
+# http_cache.py – on-disk response cache that sits under FetchEngine.fetch.
+# Bodies are stored once per content hash (the same careers page reached via two
+# URLs costs one blob), entries expire by per-domain TTL, stale entries are
+# revalidated with ETag / Last-Modified, and the store is trimmed LRU-first by size.
+
+
+import hashlib
+import sqlite3
+from collections import Counter
+import threading
+import time
+import zlib
+import logging
+
+logger = logging.getLogger("http_cache")
+
+CACHE_FILE = ".http_cache.sqlite"
+DEFAULT_TTL = 12 * 3600
+MAX_BYTES = 512 * 1024 * 1024
+
+# seconds; matched against the host and its parent domains
+DOMAIN_TTLS = {
+    "api.duckduckgo.com": 7 * 24 * 3600,
+    "linkedin.com": 7 * 24 * 3600,
+    "climatetechlist.com": 3600,
+    "climatebase.org": 3600,
+    "terra.do": 3600,
+    "workonclimate.org": 3600,
+    "remotive.com": 3600,
+    "greenhouse.io": 6 * 3600,
+    "lever.co": 6 * 3600,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    final_url TEXT,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL REFERENCES blobs(hash),
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at);
+"""
+
+
+class CacheEntry:
+    def __init__(self, url, status, final_url, content_type, etag, last_modified, text, stored_at):
+        self.url = url
+        self.status = status
+        self.final_url = final_url
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.text = text
+        self.stored_at = stored_at
+
+    def validators(self):
+        #Headers for a conditional GET
+        h = {}
+        if self.etag:
+            h["If-None-Match"] = self.etag
+        if self.last_modified:
+            h["If-Modified-Since"] = self.last_modified
+        return h
+
+
+class HttpCache:
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES, default_ttl=DEFAULT_TTL, domain_ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.domain_ttls = dict(DOMAIN_TTLS if domain_ttls is None else domain_ttls)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._writes = 0
+        # url -> last read; written with the next put() so a read never leaves a write transaction open
+        self._accessed = {}
+
+    def ttl_for(self, host):
+        host = (host or "").lower()
+        parts = host.split(".")
+        for i in range(len(parts)):
+            ttl = self.domain_ttls.get(".".join(parts[i:]))
+            if ttl is not None:
+                return ttl
+        return self.default_ttl
+
+    def is_fresh(self, entry, host):
+        return time.time() - entry.stored_at < self.ttl_for(host)
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT e.status, e.final_url, e.content_type, e.etag, e.last_modified, b.body, e.stored_at "
+                "FROM entries e JOIN blobs b ON b.hash = e.body_hash WHERE e.url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time.time()
+        status, final_url, ctype, etag, lm, body, stored_at = row
+        text = zlib.decompress(body).decode("utf-8", errors="replace")
+        return CacheEntry(url, status, final_url, ctype, etag, lm, text, stored_at)
+
+    def _flush_accessed(self):
+        # caller holds the lock and is inside a transaction
+        if self._accessed:
+            self._db.executemany("UPDATE entries SET accessed_at = ? WHERE url = ?",
+                                 [(t, u) for u, t in self._accessed.items()])
+            self._accessed.clear()
+
+    def put(self, url, status, text, headers=None, final_url=None):
+        headers = headers or {}
+        raw = (text or "").encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        body = zlib.compress(raw, 6)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO blobs(hash, body, size) VALUES (?, ?, ?)",
+                             (digest, body, len(body)))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries(url, status, final_url, content_type, etag, last_modified, "
+                "body_hash, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, final_url or url, headers.get("Content-Type"), headers.get("ETag"),
+                 headers.get("Last-Modified"), digest, now, now))
+            self._accessed.pop(url, None)
+            self._flush_accessed()
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict()
+
+    def refresh(self, url):
+        #Server answered 304 - the stored copy is good for another TTL
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._accessed.pop(url, None)
+            self._flush_accessed()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self):
+        # caller holds the lock; drop least-recently-used entries until under max_bytes
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._db.execute(
+            "SELECT e.url, e.body_hash, b.size FROM entries e JOIN blobs b ON b.hash = e.body_hash "
+            "ORDER BY e.accessed_at").fetchall()
+        # a blob shared by several URLs is only freed once the last of them is dropped
+        refs = Counter(digest for _, digest, _ in rows)
+        drop = []
+        for url, digest, size in rows:
+            if total <= target:
+                break
+            drop.append((url,))
+            refs[digest] -= 1
+            if refs[digest] == 0:
+                total -= size
+        self._db.executemany("DELETE FROM entries WHERE url = ?", drop)
+        self._db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT body_hash FROM entries)")
+        logger.info(f" HTTP cache trimmed {len(drop)} entries")
+
+    def evict(self):
+        with self._lock, self._db:
+            self._flush_accessed()
+            self._evict()
+
+    def close(self):
+        with self._lock:
+            try:
+                with self._db:
+                    self._flush_accessed()
+            except sqlite3.Error as e:
+                logger.debug(f"HTTP cache: access times not saved - {e}")
+            self._db.close()
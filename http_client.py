@@ -0,0 +1,159 @@
+# http_client.py – builds the HTTP client every module shares (via fetcher.FetchEngine).
+# Keep-alive connection pools sized to our thread count (with bigger pools for hosts we
+# hit a lot), a small DNS cache, optional HTTP/2 through httpx, and connection-reuse
+# stats so we can see whether the pools are doing their job.
+
+
+import socket
+import threading
+import time
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("http_client")
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HAVE_HTTP2 = True
+except ImportError:
+    httpx = None
+    HAVE_HTTP2 = False
+
+# hosts that get their own, larger keep-alive pool (connections kept per host)
+HOST_POOL_SIZES = {
+    "boards-api.greenhouse.io": 16,
+    "api.lever.co": 16,
+    "api.ashbyhq.com": 16,
+    "api.duckduckgo.com": 8,
+}
+DNS_TTL = 300
+
+
+class DnsCache:
+    #Wraps socket.getaddrinfo with a TTL cache; installed once per process
+
+    def __init__(self, ttl=DNS_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def _getaddrinfo(self, host, port, *args, **kwargs):
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and hit[0] > now:
+                self.hits += 1
+                return hit[1]
+            self.misses += 1
+        result = self._original(host, port, *args, **kwargs)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+        return result
+
+    def install(self):
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self._getaddrinfo
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def stats(self):
+        with self._lock:
+            return {"dns_hits": self.hits, "dns_misses": self.misses, "dns_entries": len(self._entries)}
+
+
+_dns_cache = None
+
+
+def install_dns_cache(ttl=DNS_TTL):
+    global _dns_cache
+    if _dns_cache is None:
+        _dns_cache = DnsCache(ttl).install()
+    return _dns_cache
+
+
+def make_session(pool_size=32, host_pool_sizes=None, headers=None):
+    #requests.Session with keep-alive pools: pool_size per host by default, overrides per host
+    session = requests.Session()
+    # no urllib3-level retries: FetchEngine owns retrying
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    for host, size in (HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes).items():
+        session.mount(f"https://{host}/", HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0))
+    session.headers.update(headers or {})
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class _Http2Response:
+    # just the bits of requests.Response that FetchEngine reads
+    def __init__(self, r):
+        self.status_code = r.status_code
+        self.text = r.text
+        self.content = r.content
+        self.headers = r.headers
+        self.url = str(r.url)
+
+
+class Http2Session:
+    #httpx client behind a requests-style .request(); errors are mapped to requests exceptions
+
+    def __init__(self, pool_size=32, headers=None):
+        limits = httpx.Limits(max_connections=pool_size * 4, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=limits, headers=headers or {})
+        self.headers = self.client.headers
+
+    def request(self, method, url, timeout=None, headers=None, allow_redirects=True, **kwargs):
+        try:
+            r = self.client.request(method, url, timeout=timeout, headers=headers,
+                                    follow_redirects=allow_redirects, **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.ConnectError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        return _Http2Response(r)
+
+    def close(self):
+        self.client.close()
+
+
+def make_client(pool_size=32, host_pool_sizes=None, headers=None, http2=False):
+    #The one factory: HTTP/2 client when asked for and available, else a pooled requests.Session
+    if http2:
+        if HAVE_HTTP2:
+            return Http2Session(pool_size, headers)
+        logger.warning("http2=True but httpx[http2] isn't installed - using HTTP/1.1 keep-alive")
+    return make_session(pool_size, host_pool_sizes, headers)
+
+
+def connection_stats(session):
+    #New connections vs requests across every urllib3 pool the session has opened
+    connections = requests_made = 0
+    adapters = getattr(session, "adapters", {})
+    for adapter in {id(a): a for a in adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_made += pool.num_requests
+    reused = max(requests_made - connections, 0)
+    return {
+        "connections_opened": connections,
+        "requests_sent": requests_made,
+        "connection_reuse": round(reused / requests_made, 3) if requests_made else 0.0,
+    }
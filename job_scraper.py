@@ -1,42 +1,52 @@
 #job_scraper.py — Universal Job Listing Scraper
-#Supports common ATS (Lever, Greenhouse, Workday) + generic parsing.
+#Supports common ATS (Lever, Greenhouse, Workday, Ashby, ...) via their JSON feeds,
+#with HTML parsing as the fallback + generic parsing.
 #Grabs up to 3 jobs per company, up to 200 total.
 
-import requests
-import time
-import random
 import re
-from bs4 import BeautifulSoup
+import threading
+import time
 from urllib.parse import urljoin
 import logging
 
+from fetcher import get_engine
+from html_parser import Document
+from ats_clients import fetch_postings
+from ats_detect import detect_ats
+from link_classifier import default_classifier
+from metrics import get_metrics
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("JobScraper")
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-}
+LOCATION_RE = re.compile("location")
 
 
 class JobBoardScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+    def __init__(self, fetcher=None, stop_event=None, per_company=3, max_total=200):
+        self.fetcher = fetcher or get_engine()
+        # jobs kept per company (the Data sheet shows three per row, more go on extra rows)
+        self.per_company = per_company
+        # set by the pipeline once it has enough jobs; checked before every fetch
+        self.stop_event = stop_event or threading.Event()
+        self._lock = threading.Lock()
         self.total = 0
-        self.max_total = 200
+        # a cap of its own for standalone use; None when a caller (the pipeline) owns the quota
+        self.max_total = max_total
+        self.metrics = get_metrics()
 
-    def _get(self, url):
-        """Safe GET with retries"""
-        if self.total >= self.max_total:
+    @property
+    def stopped(self):
+        return self.stop_event.is_set() or (self.max_total is not None and self.total >= self.max_total)
+
+    def _get_doc(self, url, doc=None):
+        # use the page the enricher already fetched when there is one
+        if doc is not None:
+            return doc
+        if self.stopped:
             return None
-        for _ in range(2):
-            try:
-                r = self.session.get(url, timeout=12)
-                if r.status_code == 200:
-                    return r.text
-            except Exception:
-                time.sleep(2)
-        return None
+        res = self.fetcher.fetch(url, timeout=12)
+        return Document(url, res.text, res.final_url) if res.status == 200 else None
 
     def detect_platform(self, url):
         u = url.lower()
@@ -45,27 +55,28 @@ class JobBoardScraper:
         if "workday" in u: return "workday"
         return "generic"
 
-    def scrape_lever(self, url):
-        html = self._get(url)
-        if not html:
+    def scrape_lever(self, url, doc=None):
+        doc = self._get_doc(url, doc)
+        if not doc:
             return []
-        soup = BeautifulSoup(html, "html.parser")
-        postings = soup.select("div.posting, a.posting")[:3]
+        soup = doc.soup
+        postings = soup.select("div.posting, a.posting")[:self.per_company]
         jobs = []
         for p in postings:
             a = p if p.name == "a" else p.find("a")
             if not a: continue
             title = a.get_text(strip=True)
-            loc = (p.find(class_=re.compile("location")) or {}).get_text(strip=True) if hasattr(p.find(class_=re.compile("location")), "get_text") else "Remote"
+            loc_el = p.find(class_=LOCATION_RE)
+            loc = loc_el.get_text(strip=True) if loc_el else "Remote"
             jobs.append({"title": title, "url": urljoin(url, a["href"]), "location": loc})
         return jobs
 
-    def scrape_greenhouse(self, url):
-        html = self._get(url)
-        if not html:
+    def scrape_greenhouse(self, url, doc=None):
+        doc = self._get_doc(url, doc)
+        if not doc:
             return []
-        soup = BeautifulSoup(html, "html.parser")
-        items = soup.select("div.opening, section.level-0 a")[:3]
+        soup = doc.soup
+        items = soup.select("div.opening, section.level-0 a")[:self.per_company]
         jobs = []
         for i in items:
             a = i if i.name == "a" else i.find("a")
@@ -77,49 +88,66 @@ class JobBoardScraper:
             })
         return jobs
 
-    def scrape_workday(self, url):
-        html = self._get(url)
-        if not html:
+    def scrape_workday(self, url, doc=None):
+        doc = self._get_doc(url, doc)
+        if not doc:
             return []
-        soup = BeautifulSoup(html, "html.parser")
+        soup = doc.soup
         jobs = []
-        for li in soup.find_all("li", {"data-automation-id": "listItem"})[:3]:
+        for li in soup.find_all("li", {"data-automation-id": "listItem"})[:self.per_company]:
             a = li.find("a", href=True)
             if not a: continue
             jobs.append({"title": a.get_text(strip=True), "url": urljoin(url, a["href"]), "location": "Remote"})
         return jobs
 
-    def scrape_generic(self, url):
-        html = self._get(url)
-        if not html:
+    def scrape_generic(self, url, doc=None):
+        doc = self._get_doc(url, doc)
+        if not doc:
             return []
-        soup = BeautifulSoup(html, "html.parser")
-        jobs = []
-        for link in soup.find_all("a", href=True):
-            text = link.get_text(strip=True)
-            if len(text) < 5: continue
-            if any(k in text.lower() for k in ["engineer", "manager", "developer", "analyst", "scientist"]):
-                jobs.append({
-                    "title": text[:120],
-                    "url": urljoin(url, link["href"]),
-                    "location": "Remote"
-                })
-            if len(jobs) >= 3:
+        # best-scoring job-title links (see link_classifier.JOB_WORDS), one per URL
+        jobs, seen = [], set()
+        for score, pos, link, text in default_classifier().classify(doc, url, min_len=5)["job"]:
+            if link in seen:
+                continue
+            seen.add(link)
+            jobs.append({"title": text[:120], "url": link, "location": "Remote"})
+            if len(jobs) >= self.per_company:
                 break
         return jobs
 
-    def scrape_company_jobs(self, careers_url, company_name=""):
-        """Main dispatcher"""
-        if not careers_url or self.total >= self.max_total:
+    def scrape_company_jobs(self, careers_url, company_name="", docs=None):
+        """Main dispatcher. docs: {url: Document} already fetched during enrichment"""
+        if not careers_url or self.stopped:
             return []
-        platform = self.detect_platform(careers_url)
-        logger.info(f" {company_name} | Platform detected: {platform}")
-        func = {
-            "lever": self.scrape_lever,
-            "greenhouse": self.scrape_greenhouse,
-            "workday": self.scrape_workday
-        }.get(platform, self.scrape_generic)
-        jobs = func(careers_url)
-        self.total += len(jobs)
-        logger.info(f" {company_name}: {len(jobs)} jobs found (total {self.total})")
+        start = time.monotonic()
+        doc = (docs or {}).get(careers_url)
+        target = detect_ats(careers_url, doc)
+        if target is None:
+            # not an ATS URL - we need the page anyway, so look inside it for an embedded board
+            doc = self._get_doc(careers_url, doc)
+            target = detect_ats(careers_url, doc) if doc else None
+        # the platform the enricher / ATS detection found in the page beats URL substrings
+        platform = (doc.platform if doc is not None and doc.platform else None) or self.detect_platform(careers_url)
+        logger.info(f" {company_name} | Platform detected: {target.platform if target else platform}")
+        # JSON feed first; HTML only when the board has no feed or the feed came back empty
+        jobs = []
+        if target:
+            jobs = fetch_postings(target, self.fetcher, limit=self.per_company)
+        if not jobs:
+            func = {
+                "lever": self.scrape_lever,
+                "greenhouse": self.scrape_greenhouse,
+                "workday": self.scrape_workday
+            }.get(platform, self.scrape_generic)
+            jobs = func(careers_url, doc)
+            if not jobs and func != self.scrape_generic:
+                # e.g. a company page with a board embedded by script: the ATS markup isn't in it
+                jobs = self.scrape_generic(careers_url, doc)
+        with self._lock:
+            self.total += len(jobs)
+            total = self.total
+        label = target.platform if target else platform
+        self.metrics.observe("scrape_seconds", time.monotonic() - start, platform=label)
+        self.metrics.inc("jobs_found_total", len(jobs), source=label)
+        logger.info(f" {company_name}: {len(jobs)} jobs found (total {total})")
         return jobs
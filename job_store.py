@@ -0,0 +1,236 @@
+# job_store.py – the persistent job store the Excel workbook is exported from.
+# Two tables: companies (one row per normalized company name) and postings (one row per
+# posting, keyed by canonical posting URL, linked to its company), both with
+# first_seen/last_seen. Writers (the pipeline, extra_boards.py) upsert batches of long
+# rows in a single SQLite transaction; WAL mode plus a busy timeout lets separate
+# processes write at the same time. The wide Data sheet is only a view: export_xlsx()
+# rebuilds it from the store, Methodology sheet included, so a merge costs O(new rows).
+
+
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from dedup import Deduplicator, canonical_url, jaccard, url_host
+from enrichment_store import normalize_name
+from output_sink import COMPANY_COLUMNS, ROW_COLUMNS, export_xlsx, to_wide
+
+STORE_FILE = "climate_jobs_output.jobs.sqlite"
+
+# Data-sheet column -> companies column
+COMPANY_FIELDS = dict(zip(COMPANY_COLUMNS, ["name", "description", "website", "linkedin",
+                                            "careers_page", "listings_page"]))
+NO_COMPANY = ("", "unknown", "unknown company")
+
+COMPANIES_TABLE = """CREATE TABLE IF NOT EXISTS companies (
+    company_key TEXT PRIMARY KEY,
+    name TEXT, description TEXT, website TEXT, linkedin TEXT, careers_page TEXT, listings_page TEXT,
+    first_seen REAL NOT NULL, last_seen REAL NOT NULL
+);"""
+POSTINGS_TABLE = """CREATE TABLE IF NOT EXISTS postings (
+    url TEXT PRIMARY KEY,
+    company_key TEXT NOT NULL REFERENCES companies (company_key),
+    title TEXT, job_url TEXT, location TEXT, source TEXT,
+    first_seen REAL NOT NULL, last_seen REAL NOT NULL
+);"""
+
+_INSERT_COMPANY = """INSERT INTO companies (company_key, name, description, website, linkedin,
+        careers_page, listings_page, first_seen, last_seen)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (company_key) DO UPDATE SET last_seen = excluded.last_seen"""
+# keep first_seen, refresh the rest (empty values don't overwrite stored ones)
+UPSERT_COMPANY = _INSERT_COMPANY + "".join(
+    f",\n        {col} = COALESCE(NULLIF(excluded.{col}, ''), {col})" for col in COMPANY_FIELDS.values())
+# board rows only add companies we don't have yet; an existing company just gets last_seen
+UPSERT_BOARD_COMPANY = _INSERT_COMPANY
+
+
+def _text(value):
+    # cells read back through pandas come in as NaN when empty
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _from_board(company, job_url):
+    # board_sources.JobRecord.to_row(): "From <board>" and the posting URL standing in for the company's pages
+    return company["description"].startswith("From ") and job_url != "" and company["careers_page"] == job_url
+
+
+def company_key(name, description=""):
+    #Companies are matched on normalized name; board jobs without a company stay apart per board
+    key = normalize_name(name)
+    if key in NO_COMPANY:
+        return f"unknown|{normalize_name(description)}"
+    return key
+
+
+class JobStore:
+    def __init__(self, path=STORE_FILE, timeout=30.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dedup = Deduplicator()  # only its fingerprints are used; candidates come from the bands table
+        # autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(f"""
+            {COMPANIES_TABLE}
+            {POSTINGS_TABLE}
+            CREATE INDEX IF NOT EXISTS postings_company ON postings (company_key);
+            CREATE TABLE IF NOT EXISTS bands (band TEXT NOT NULL, url TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS bands_band ON bands (band);
+            CREATE TABLE IF NOT EXISTS methodology (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, step TEXT, notes TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def _transaction(self, work):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def begin_run(self, methodology=None):
+        #Start a fresh view: only what's seen from now on is exported; optionally reset Methodology
+        def work(db):
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run_started', ?)", (str(time.time()),))
+            if methodology is not None:
+                db.execute("DELETE FROM methodology")
+                db.executemany("INSERT INTO methodology (step, notes) VALUES (?, ?)",
+                               [(m["Step"], m["Notes"]) for m in methodology])
+        self._transaction(work)
+
+    def add_methodology(self, step, notes):
+        self._transaction(lambda db: db.execute(
+            "INSERT INTO methodology (step, notes) VALUES (?, ?)", (step, notes)))
+
+    def _near_duplicate(self, db, title, company, job_url=""):
+        # an existing posting at the same company with a nearly identical title, via the LSH band index;
+        # two different URLs on the same host are separate postings, never near-duplicates
+        fp = self._dedup.fingerprint(title, company)
+        if fp is None:
+            return None, []
+        sh, bands = fp
+        keys = [f"{i}:{b.hex()}" for i, b in bands]
+        host = url_host(canonical_url(job_url)) if job_url else ""
+        for url, other_title, other_url in db.execute(
+                f"SELECT DISTINCT p.url, p.title, p.job_url FROM bands b JOIN postings p ON p.url = b.url "
+                f"WHERE b.band IN ({','.join('?' * len(keys))})", keys):
+            if host and other_url and url_host(url) == host:
+                continue
+            other = self._dedup.fingerprint(other_title, company)
+            if other is not None and jaccard(sh, other[0]) >= self._dedup.threshold:
+                return url, keys
+        return None, keys
+
+    def upsert(self, rows, source=""):
+        #Long rows (output_sink.ROW_COLUMNS) -> (new postings, postings already stored), in one transaction
+        now = time.time()
+
+        def work(db):
+            inserted = updated = 0
+            for row in rows:
+                company = {col: _text(row.get(name)) for name, col in COMPANY_FIELDS.items()}
+                ckey = company_key(company["name"], company["description"])
+                title, job_url = _text(row.get("job title")), _text(row.get("job URL"))
+                location = _text(row.get("job location"))
+                # a board posting's stand-in company fields never replace what's stored
+                db.execute(UPSERT_BOARD_COMPANY if _from_board(company, job_url) else UPSERT_COMPANY,
+                           (ckey, company["name"], company["description"], company["website"],
+                            company["linkedin"], company["careers_page"], company["listings_page"], now, now))
+
+                if not title and not job_url:
+                    continue
+                key = canonical_url(job_url) if job_url else f"title:{ckey}:{normalize_name(title)}"
+                if db.execute("SELECT 1 FROM postings WHERE url = ?", (key,)).fetchone():
+                    db.execute("UPDATE postings SET last_seen = ?, location = COALESCE(NULLIF(?, ''), location) "
+                               "WHERE url = ?", (now, location, key))
+                    updated += 1
+                    continue
+                match, bands = self._near_duplicate(db, title, company["name"], job_url) if title else (None, [])
+                if match is not None:
+                    # the same job seen elsewhere - keep the stored posting's own details
+                    db.execute("UPDATE postings SET last_seen = ? WHERE url = ?", (now, match))
+                    updated += 1
+                    continue
+                db.execute("""
+                    INSERT INTO postings (url, company_key, title, job_url, location, source, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", (key, ckey, title, job_url, location, source, now, now))
+                db.executemany("INSERT INTO bands (band, url) VALUES (?, ?)", [(b, key) for b in bands])
+                inserted += 1
+            return inserted, updated
+
+        return self._transaction(work)
+
+    def touch(self, job_urls, limit=None):
+        #Postings still listed but not re-collected (known to the seen index): refresh last_seen
+        #so they stay in this run's view, at most limit of them (in job_urls order).
+        #Returns how many stored postings were refreshed.
+        keys = list(dict.fromkeys(canonical_url(u) for u in job_urls if u))
+        now = time.time()
+
+        def work(db):
+            stored = set()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                stored.update(url for url, in db.execute(
+                    f"SELECT url FROM postings WHERE url IN ({','.join('?' * len(chunk))})", chunk))
+            picked = [k for k in keys if k in stored][:limit]
+            for i in range(0, len(picked), 500):
+                chunk = picked[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                db.execute(f"UPDATE postings SET last_seen = ? WHERE url IN ({marks})", [now] + chunk)
+                db.execute(f"UPDATE companies SET last_seen = ? WHERE company_key IN "
+                           f"(SELECT company_key FROM postings WHERE url IN ({marks}))", [now] + chunk)
+            return len(picked)
+
+        return self._transaction(work)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def _run_started(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'run_started'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def frame(self, current_run=True):
+        #Companies joined with their postings as long rows (plus company_key), for aggregation and export
+        since = self._run_started() if current_run else 0.0
+        select = ", ".join(f"c.{col} AS \"{name}\"" for name, col in COMPANY_FIELDS.items())
+        with self._lock:
+            df = pd.read_sql_query(f"""
+                SELECT c.company_key, {select},
+                       p.title AS "job title", p.job_url AS "job URL", p.location AS "job location"
+                FROM companies c
+                LEFT JOIN postings p ON p.company_key = c.company_key AND p.last_seen >= ?
+                WHERE c.last_seen >= ?
+                ORDER BY c.rowid, p.rowid""", self._db, params=(since, since))
+        return df.reindex(columns=["company_key"] + ROW_COLUMNS)
+
+    def view(self):
+        #The wide Data sheet: this run's companies, three postings per row
+        df = self.frame()
+        # board postings without a real company name each get their own row
+        key = df["company_key"].where(~df["company_key"].str.startswith("unknown|"),
+                                      df["company_key"] + "|" + df["job URL"].fillna(""))
+        return to_wide(df.drop(columns="company_key"), key=key)
+
+    def methodology(self):
+        with self._lock:
+            return pd.read_sql_query("SELECT step AS Step, notes AS Notes FROM methodology ORDER BY seq", self._db)
+
+    def export_xlsx(self, path):
+        export_xlsx(path, {"Data": self.view(), "Methodology": self.methodology()})
+
+    def close(self):
+        with self._lock:
+            self._db.close()
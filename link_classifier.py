@@ -0,0 +1,91 @@
+# link_classifier.py – scores links against weighted keyword sets in one pass.
+# All keywords of every category are compiled into a single regex, so each link's text
+# is scanned once no matter how many words the vocabularies hold; the per-category
+# score is the sum of the weights of the keywords that matched. Keywords only match
+# whole words ("intern" isn't in "International"), so plurals are listed explicitly.
+
+
+import re
+from urllib.parse import urljoin
+
+from html_parser import iter_links
+
+# keyword -> weight; negative weights push out look-alikes ("Meet our engineers")
+JOB_WORDS = {
+    "engineer": 2, "manager": 2, "developer": 2, "analyst": 2, "scientist": 2,
+    "designer": 2, "architect": 2, "specialist": 2, "coordinator": 2, "director": 2,
+    "technician": 2, "consultant": 2, "researcher": 2, "administrator": 2, "accountant": 2,
+    "recruiter": 2, "strategist": 2, "associate": 2, "intern": 2, "officer": 2,
+    "representative": 2, "head of": 2, "vp": 2, "advisor": 2, "operator": 2, "internship": 2,
+    # the forms a substring match used to catch ("Senior Engineers", "Mechanical Engineering Lead")
+    "engineers": 2, "engineering": 2, "managers": 2, "developers": 2, "analysts": 2, "scientists": 2,
+    "designers": 2, "architects": 2, "specialists": 2, "coordinators": 2, "directors": 2,
+    "technicians": 2, "consultants": 2, "researchers": 2, "administrators": 2, "accountants": 2,
+    "recruiters": 2, "strategists": 2, "associates": 2, "interns": 2, "officers": 2,
+    "representatives": 2, "advisors": 2, "operators": 2, "internships": 2,
+    "science": 1, "senior": 1, "junior": 1, "lead": 1, "principal": 1, "staff": 1, "remote": 1,
+    "full-time": 1, "part-time": 1, "contract": 1,
+    "blog": -3, "news": -3, "press": -3, "learn more": -3, "read more": -3, "meet": -3,
+    "our team": -2, "case study": -3, "case studies": -3,
+}
+CAREERS_WORDS = {
+    "career": 3, "careers": 3, "job": 2, "jobs": 2, "join us": 2, "join our team": 3,
+    "open position": 3, "open positions": 3, "open role": 3, "open roles": 3,
+    "work with": 1, "work at": 2, "hiring": 2, "vacancy": 3, "vacancies": 3, "join": 1,
+    "newsletter": -3, "community": -1, "slack": -2, "discord": -2,
+}
+
+VOCABULARIES = {"job": JOB_WORDS, "careers": CAREERS_WORDS}
+# minimum score for a link to count, per category (one strong keyword is enough)
+THRESHOLDS = {"job": 2, "careers": 1}
+
+
+class LinkClassifier:
+    def __init__(self, vocabularies=None, thresholds=None):
+        self.vocabularies = vocabularies or VOCABULARIES
+        self.thresholds = dict(THRESHOLDS if thresholds is None else thresholds)
+        # keyword -> [(category, weight)]
+        self._weights = {}
+        for category, words in self.vocabularies.items():
+            for word, weight in words.items():
+                self._weights.setdefault(word.lower(), []).append((category, weight))
+        # longest first so "join our team" wins over "join" at the same position
+        alternation = "|".join(re.escape(w) for w in sorted(self._weights, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b(?:{alternation})\b") if alternation else None
+
+    def score(self, text):
+        #{category: score} for one piece of link text (categories with no hits are left out)
+        scores = {}
+        if not text or self._pattern is None:
+            return scores
+        for m in self._pattern.finditer(text.lower()):
+            for category, weight in self._weights[m.group(0)]:
+                scores[category] = scores.get(category, 0) + weight
+        return scores
+
+    def classify(self, html, base_url, min_len=0):
+        #One pass over the page's links -> {category: [(score, position, url, text)]}, best first
+        found = {c: [] for c in self.vocabularies}
+        for pos, (href, text) in enumerate(iter_links(html)):
+            if len(text) < min_len:
+                continue
+            for category, score in self.score(text).items():
+                if score >= self.thresholds.get(category, 1):
+                    found[category].append((score, pos, urljoin(base_url, href), text))
+        for hits in found.values():
+            # highest score first, page order breaks ties
+            hits.sort(key=lambda h: (-h[0], h[1]))
+        return found
+
+    def best(self, html, base_url, category, limit=1, min_len=0):
+        return self.classify(html, base_url, min_len=min_len)[category][:limit]
+
+
+_default = None
+
+
+def default_classifier():
+    global _default
+    if _default is None:
+        _default = LinkClassifier()
+    return _default
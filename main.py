@@ -3,27 +3,72 @@
 
 
 import pandas as pd
+import asyncio
+import os
 import time
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
+import threading
 
 from company_enricher import CompanyEnricher
 from job_scraper import JobBoardScraper
-from board_scraper import scrape_200_climate_jobs  # fallback source
+from board_sources import BoardScheduler  # fallback source
+from dedup import Deduplicator
+from fetcher import get_engine
+from enrichment_store import EnrichmentStore
+from output_sink import company_rows, open_sink, read_sink
+from job_store import JobStore
+from seen_index import SeenIndex
+from checkpoint import CheckpointJournal
+from stages import Stage, StagedPipeline
+from metrics import get_metrics
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("job_pipeline")
 
+METHODOLOGY = [
+     {"Step": "1. Load data", "Notes": "Read company names from CSV file"},
+     {"Step": "2. Find sites", "Notes": "Used DuckDuckGo search to get domains/LinkedIn"},
+     {"Step": "3. Find careers pages", "Notes": "Looked for /careers or similar links"},
+     {"Step": "4. Scrape jobs", "Notes": "Grabbed job titles and links via BeautifulSoup"},
+     {"Step": "5. Validate", "Notes": "Checked sample URLs manually"},
+]
+
 
 class AssignmentPipeline:
-    def __init__(self, input_csv="companies_input.csv", output_excel="climate_jobs_output.xlsx"):
+    def __init__(self, input_csv="companies_input.csv", output_excel="climate_jobs_output.xlsx", workers=16,
+                 sink_path=None, enrich_workers=None, scrape_workers=None, jobs_per_company=3,
+                 progress_every=None):
         self.input_csv = input_csv
         self.output_excel = output_excel
-        self.enricher = CompanyEnricher()
-        self.scraper = JobBoardScraper()
-        self.results = []
+        # rows (one per job) are streamed here as they finish (.jsonl/.csv/.sqlite)
+        self.sink_path = sink_path or os.path.splitext(output_excel)[0] + ".rows.jsonl"
+        self.sink = None
+        self.checkpoint_path = os.path.splitext(output_excel)[0] + ".checkpoint.jsonl"
+        # persistent job store the workbook is exported from
+        self.store_path = os.path.splitext(output_excel)[0] + ".jobs.sqlite"
+        # run metrics, written as <output>.metrics.json and .metrics.prom at the end
+        self.metrics_path = os.path.splitext(output_excel)[0] + ".metrics"
+        self.metrics = get_metrics()
+        # seconds between live metrics summaries in the log (None = only at the end)
+        self.progress_every = progress_every
+        self.journal = None
+        self.workers = workers
+        # separate pools so slow DuckDuckGo lookups don't eat ATS scraping capacity
+        self.enrich_workers = enrich_workers or workers
+        self.scrape_workers = scrape_workers or workers
+        self.staged = None
+        self.fetcher = get_engine()
+        # one stop signal for everything: set once max_jobs is reached
+        self.stop_event = threading.Event()
+        self.enricher = CompanyEnricher(self.fetcher, store=EnrichmentStore(), stop_event=self.stop_event)
+        # no cap inside the scraper: jobs found aren't jobs written, and a scraper that stops on
+        # its own count hands back [] that would be journalled as a real empty result
+        self.scraper = JobBoardScraper(self.fetcher, stop_event=self.stop_event, per_company=jobs_per_company,
+                                       max_total=None)
+        self.rows_written = 0
+        self.jobs_written = 0
         self.max_jobs = 200
         self.start = datetime.now()
 
@@ -31,93 +76,225 @@ class AssignmentPipeline:
         df = pd.read_csv(self.input_csv)
         df.columns = df.columns.str.strip()
         logger.info(f" Loaded {len(df)} companies.")
+        if self.enricher.store:
+            logger.info(f" Enrichment store: {self.enricher.store.warm_start()} companies already known.")
         return df
 
-    def process_company(self, row):
+    # the three steps below are the pipeline stages; process_company chains them for run_async
+
+    def enrich_step(self, row):
         name = str(row.get("Company Name", "")).strip()
         desc = str(row.get("Company Description", "")).strip()
         if not name:
             return None
 
-        enriched = self.enricher.enrich_company(name, desc)
-        jobs = []
-        for key in ["job_listings_url", "careers_page", "website"]:
-            url = enriched.get(key)
-            if url:
-                jobs = self.scraper.scrape_company_jobs(url, name)
-                if jobs:
-                    break
+        # reuse whatever an interrupted run already finished for this company
+        enriched = self.journal.data(name, "enriched") if self.journal else None
+        docs = {}
+        if enriched is None:
+            enriched = self.enricher.enrich_company(name, desc)
+            # pages fetched during enrichment travel with the item instead of being refetched
+            docs = enriched.pop("docs", None) or {}
+            if self.stop_event.is_set():
+                return None  # cut short - leave it for a later run to redo
+            if self.journal:
+                self.journal.record(name, "enriched", enriched)
+        return {"name": name, "desc": desc, "enriched": enriched, "docs": docs}
+
+    def scrape_step(self, item):
+        name, enriched = item["name"], item["enriched"]
+        jobs = self.journal.data(name, "scraped") if self.journal else None
+        if jobs is None:
+            jobs = []
+            for key in ["job_listings_url", "careers_page", "website"]:
+                url = enriched.get(key)
+                if url:
+                    jobs = self.scraper.scrape_company_jobs(url, name, docs=item["docs"])
+                    if jobs:
+                        break
+            if self.stop_event.is_set():
+                return None
+            if self.journal:
+                self.journal.record(name, "scraped", jobs)
+        item["jobs"] = jobs
+        item["docs"] = None  # done with the pages - let them go before the write queue
+        return item
 
-        row_data = {
-            "Company Name": name,
-            "Company Description": desc,
+    def build_rows(self, item):
+        # one long row per job (company columns repeated); the wide sheet is made at export
+        enriched = item["enriched"]
+        return company_rows({
+            "Company Name": item["name"],
+            "Company Description": item["desc"],
             "Website URL": enriched.get("website", ""),
             "LinkedIn URL": enriched.get("linkedin", ""),
             "Careers Page URL": enriched.get("careers_page", ""),
             "Job listings page URL": enriched.get("job_listings_url", "")
-        }
-        for i in range(3):
-            prefix = f"job post{i+1}"
-            if i < len(jobs):
-                job = jobs[i]
-                row_data[f"{prefix} title"] = job["title"]
-                row_data[f"{prefix} URL"] = job["url"]
-                row_data[f"{prefix} location"] = job["location"]
-            else:
-                row_data[f"{prefix} title"] = ""
-                row_data[f"{prefix} URL"] = ""
-                row_data[f"{prefix} location"] = ""
-        return row_data
-
-    def run(self):
+        }, item["jobs"])
+
+    def process_company(self, row):
+        # stages.py times each step in the threaded run; here (run_async) we do it ourselves
+        with self.metrics.timer("stage_seconds", stage="enrich"):
+            item = self.enrich_step(row)
+        if item is None:
+            return None
+        with self.metrics.timer("stage_seconds", stage="scrape"):
+            item = self.scrape_step(item)
+        if item is None:
+            return None
+        return self.build_rows(item)
+
+    @staticmethod
+    def count_jobs(rows):
+        return sum(1 for row in rows if row.get("job URL"))
+
+    def emit(self, rows, key=None):
+        # hand one finished company's rows to the sink (flushed immediately), then mark it
+        # written; only ever called from one thread (the write stage / the event loop)
+        n = self.count_jobs(rows)
+        room = self.max_jobs - self.jobs_written
+        if n > room:
+            if room <= 0:
+                return  # quota already met by companies that finished first
+            # the company that crosses the quota only gets what's left of it
+            rows = [row for row in rows if row.get("job URL")][:room]
+            n = room
+        for row in rows:
+            self.sink.write(row)
+        self.rows_written += 1
+        self.jobs_written += n
+        self.metrics.inc("companies_written_total")
+        self.metrics.inc("jobs_written_total", n)
+        self.journal.record(key or rows[0]["Company Name"], "written", n)
+        if self.jobs_written >= self.max_jobs and not self.stop_event.is_set():
+            logger.info(f" {self.max_jobs} jobs reached - stopping now.")
+            self.stop_event.set()
+
+    def start_run(self, resume=False):
+        # open sink + journal; on resume keep both and drop companies already written
+        self.metrics.reset()
+        if self.progress_every:
+            self.metrics.start_progress(self.progress_every)
         df = self.load_companies()
-        logger.info(" Beginning company processing...")
-        with ThreadPoolExecutor(max_workers=5) as ex:
-            futures = [ex.submit(self.process_company, row) for _, row in df.iterrows()]
-            for f in as_completed(futures):
-                data = f.result()
-                if data:
-                    self.results.append(data)
-                if len(self.results) >= self.max_jobs:
-                    logger.info(" 200 jobs reached - stopping now.")
+        self.journal = CheckpointJournal(self.checkpoint_path, resume=resume)
+        # the journal marks a company written right after its rows go to the sink, so the
+        # sink has to keep them on disk immediately (no buffering Parquet sink here)
+        self.sink = open_sink(self.sink_path, append=resume, durable=True)
+        self.store = JobStore(self.store_path)
+        if not resume:
+            self.store.begin_run(METHODOLOGY)
+        self.rows_written = self.journal.count("written") if resume else 0
+        self.jobs_written = self.journal.total("written") if resume else 0
+        self.stop_event.clear()
+        if resume:
+            names = df.get("Company Name", pd.Series(dtype=str)).astype(str).str.strip()
+            done = names.map(lambda n: self.journal.done(n, "written"))
+            df = df[~done]
+            logger.info(f" Resuming: {int(done.sum())} companies already written, {len(df)} left.")
+        return df
+
+    def write_step(self, item):
+        # single writer: sink + journal stay in completion order
+        self.emit(self.build_rows(item))
+
+    def run(self, resume=False):
+        df = self.start_run(resume)
+        logger.info(f" Beginning company processing (streaming rows to {self.sink_path})...")
+        self.staged = StagedPipeline([
+            Stage("enrich", self.enrich_step, workers=self.enrich_workers),
+            Stage("scrape", self.scrape_step, workers=self.scrape_workers),
+            Stage("write", self.write_step, workers=1, queue_size=self.scrape_workers * 2),
+        ], stop_event=self.stop_event)
+        self.staged.run(row for _, row in df.iterrows())
+
+        self.finish()
+
+    async def run_async(self, resume=False):
+        # same as run() but scheduled on the shared fetch engine's event-loop front-end;
+        # the engine's concurrency setting is the only cap on in-flight requests
+        df = self.start_run(resume)
+        logger.info(f" Beginning company processing (async, streaming rows to {self.sink_path})...")
+        slots = asyncio.Semaphore(self.workers)
+
+        async def one(row):
+            async with slots:
+                return await self.fetcher.run_blocking(self.process_company, row)
+
+        tasks = [asyncio.ensure_future(one(row)) for _, row in df.iterrows()]
+        try:
+            for coro in asyncio.as_completed(tasks):
+                data = await coro
+                if data and not self.stop_event.is_set():
+                    self.emit(data)
+                if self.stop_event.is_set():
                     break
+        finally:
+            # queued tasks are dropped; running ones see stop_event and return early
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        if len(self.results) < self.max_jobs:
+        self.finish()
+
+    def finish(self):
+        # top up from public boards if needed, then write the workbook
+        seen = None
+        collected = []
+        known_board_urls = []
+        if self.jobs_written < self.max_jobs:
             logger.info("Adding more jobs from public boards...")
-            board_jobs = scrape_200_climate_jobs()
-            for j in board_jobs[: (self.max_jobs - len(self.results))]:
-                self.results.append({
-                    "Company Name": j["company"],
-                    "Company Description": f"From {j['board']}",
-                    "Website URL": "",
-                    "LinkedIn URL": "",
-                    "Careers Page URL": j["url"],
-                    "Job listings page URL": j["url"],
-                    "job post1 title": j["title"],
-                    "job post1 URL": j["url"],
-                    "job post1 location": j["location"]
-                })
-
-        self.save_excel()
+            # every registered board source (board_scraper.py's and extra_boards.py's), minus
+            # postings already written from company careers pages or ATS feeds
+            with self.metrics.timer("stage_seconds", stage="boards"):
+                dedup = Deduplicator()
+                for row in read_sink(self.sink_path).to_dict("records"):
+                    dedup.add_row(row)
+                # incremental: each board is paged only until a page has nothing we haven't seen
+                seen = SeenIndex()
+                scheduler = BoardScheduler(quota=self.max_jobs - self.jobs_written, dedup=dedup, seen=seen)
+                collected = scheduler.run()
+                # on --resume some of these are already in the sink
+                board_jobs = [j for j in collected if not self.journal.done(f"board:{j.url}", "written")]
+                for j in board_jobs:
+                    self.emit([j.to_row()], key=f"board:{j.url}")
+                known_board_urls = [j.url for j in scheduler.known]
+
+        self.sink.close()
+        self.journal.close()
+        with self.metrics.timer("stage_seconds", stage="store"):
+            added, known = self.store.upsert(read_sink(self.sink_path).to_dict("records"), source="pipeline")
+        logger.info(f" Job store: {added} new postings, {known} already known")
+        if seen is not None:
+            # only now that they're stored - a run that dies before this collects them again
+            seen.mark(collected)
+            seen.close()
+        # postings still listed from earlier runs fill whatever is left of the quota
+        room = self.max_jobs - self.jobs_written
+        if known_board_urls and room > 0:
+            refreshed = self.store.touch(known_board_urls, limit=room)
+            logger.info(f" Job store: {refreshed} board postings still listed from earlier runs")
+        with self.metrics.timer("stage_seconds", stage="export"):
+            self.save_excel()
+        self.store.close()
+        self.fetcher.log_stats()
+        self.metrics.stop_progress()
+        self.metrics.log_summary()
+        self.metrics.export(self.metrics_path + ".json")
+        self.metrics.export(self.metrics_path + ".prom")
         logger.info(" Done!")
 
     def save_excel(self):
-        data_df = pd.DataFrame(self.results)
-        method_df = pd.DataFrame([
-     {"Step": "1. Load data", "Notes": "Read company names from CSV file"},
-     {"Step": "2. Find sites", "Notes": "Used DuckDuckGo search to get domains/LinkedIn"},
-     {"Step": "3. Find careers pages", "Notes": "Looked for /careers or similar links"},
-     {"Step": "4. Scrape jobs", "Notes": "Grabbed job titles and links via BeautifulSoup"},
-     {"Step": "5. Validate", "Notes": "Checked sample URLs manually"},
-    ])
-
-        with pd.ExcelWriter(self.output_excel, engine="openpyxl") as w:
-            data_df.to_excel(w, sheet_name="Data", index=False)
-            method_df.to_excel(w, sheet_name="Methodology", index=False)
+        # the workbook is a view of the job store (postings seen this run + later merges)
+        self.store.export_xlsx(self.output_excel)
         logger.info(f" Saved results to {self.output_excel}")
 
 # Quick test run for my own validation before submission
 
 if __name__ == "__main__":
-    pipeline = AssignmentPipeline()
-    pipeline.run()
+    import sys
+    pipeline = AssignmentPipeline(progress_every=30 if "--progress" in sys.argv else None)
+    resume = "--resume" in sys.argv
+    if "--async" in sys.argv:
+        asyncio.run(pipeline.run_async(resume=resume))
+    else:
+        pipeline.run(resume=resume)
@@ -0,0 +1,247 @@
+# metrics.py – counters and latency histograms for the whole pipeline, in one registry.
+# The fetch engine records per-host request latency, bytes, retries and cache hits; the
+# pipeline, enricher, job scraper and board sources record stage/parse timings and job
+# counts. At the end of a run the registry is written out as JSON or Prometheus text
+# (export()), and a background thread can log a one-line progress summary while it runs.
+
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("metrics")
+
+# histogram bucket upper bounds, in seconds (Prometheus' defaults plus a few slow ones)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "job_pipeline_"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        #Upper bound of the bucket holding the q-th observation (the largest one for +Inf)
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self):
+        # (le, observations <= le) pairs, as Prometheus wants them
+        out, seen = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            out.append((bound, seen))
+        return out
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+        }
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe registry. Counters and histograms are created on first use and keyed by
+    name + labels, e.g. inc("http_requests_total", host="jobs.lever.co", status="2xx").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> float
+        self._histograms = {}  # (name, labels) -> Histogram
+        self.started = time.monotonic()
+        self._progress = None
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.monotonic()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        #with metrics.timer("stage_seconds", stage="enrich"): ...
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    def total(self, name, **labels):
+        #Sum of a counter over every label set matching the given labels
+        want = set(_labels(labels))
+        with self._lock:
+            return sum(v for (n, lbl), v in self._counters.items() if n == name and want <= set(lbl))
+
+    def merged(self, name, **labels):
+        #One histogram summing every label set of name that matches the given labels
+        want = set(_labels(labels))
+        out = Histogram()
+        with self._lock:
+            for (n, lbl), h in self._histograms.items():
+                if n != name or not want <= set(lbl):
+                    continue
+                out.counts = [a + b for a, b in zip(out.counts, h.counts)]
+                out.count += h.count
+                out.sum += h.sum
+                out.max = max(out.max, h.max)
+        return out
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def derived(self):
+        # the handful of numbers worth reading first
+        elapsed = self.elapsed()
+        cache = self.total("http_cache_total")
+        jobs = self.total("jobs_written_total")
+        requests_made = self.total("http_requests_total")
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "jobs": int(jobs),
+            "jobs_found": int(self.total("jobs_found_total")),
+            "jobs_per_sec": round(jobs / elapsed, 3) if elapsed > 0 else 0.0,
+            "http_requests": int(requests_made),
+            "http_errors": int(self.total("http_errors_total")),
+            "http_retries": int(self.total("http_retries_total")),
+            "bytes_downloaded": int(self.total("http_bytes_total")),
+            "cache_hit_rate": round((cache - self.total("http_cache_total", result="miss")) / cache, 3)
+            if cache else None,
+            "http_p95_seconds": self.merged("http_request_seconds").quantile(0.95),
+            "parse_seconds": round(self.merged("html_parse_seconds").sum, 3),
+        }
+
+    def snapshot(self):
+        #Everything as plain JSON-able data
+        out = {"summary": self.derived(), "counters": {}, "histograms": {}}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                out["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                out["histograms"].setdefault(name, []).append({"labels": dict(labels), **hist.to_dict()})
+        return out
+
+    def to_prometheus(self):
+        #Prometheus text exposition format (for node_exporter's textfile collector, or just reading)
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = [(key, h.cumulative(), h.sum, h.count)
+                          for key, h in sorted(self._histograms.items(), key=lambda kv: kv[0])]
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                typed.add(name)
+            # full value - :g would turn a byte count into 1.23457e+08
+            lines.append(f"{PREFIX}{name}{_prom_labels(labels)} {int(value) if float(value).is_integer() else value!r}")
+        for (name, labels), buckets, total, count in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                typed.add(name)
+            for bound, n in buckets:
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{PREFIX}{name}_bucket{_prom_labels(labels, [('le', le)])} {n}")
+            lines.append(f"{PREFIX}{name}_sum{_prom_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_prom_labels(labels)} {count}")
+        lines.append(f"# TYPE {PREFIX}elapsed_seconds gauge")
+        lines.append(f"{PREFIX}elapsed_seconds {self.elapsed():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        #.prom / .txt -> Prometheus text, anything else -> JSON
+        if path.endswith((".prom", ".txt")):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        logger.info(f" Metrics written to {path}")
+
+    def summary(self):
+        d = self.derived()
+        hit = f"{d['cache_hit_rate']:.0%}" if d["cache_hit_rate"] is not None else "n/a"
+        p95 = f"{d['http_p95_seconds']:.2f}s" if d["http_p95_seconds"] is not None else "n/a"
+        return (f"{d['elapsed_seconds']:.0f}s: {d['jobs']} jobs ({d['jobs_per_sec']}/s, {d['jobs_found']} found), "
+                f"{d['http_requests']} requests ({d['bytes_downloaded'] / 1e6:.1f} MB, p95 {p95}), "
+                f"{d['http_retries']} retries, {d['http_errors']} errors, cache hits {hit}, "
+                f"parse {d['parse_seconds']}s")
+
+    def log_summary(self):
+        logger.info(" Metrics: " + self.summary())
+
+    def start_progress(self, every=30):
+        #Log summary() every `every` seconds until stop_progress()
+        self.stop_progress()
+        done = threading.Event()
+
+        def loop():
+            while not done.wait(every):
+                self.log_summary()
+
+        self._progress = done
+        threading.Thread(target=loop, daemon=True, name="metrics-progress").start()
+
+    def stop_progress(self):
+        if self._progress is not None:
+            self._progress.set()
+            self._progress = None
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    #Process-wide registry; every module records into this one
+    return _metrics
@@ -0,0 +1,320 @@
+# output_sink.py – append-only row sinks for the pipeline, and the Excel export.
+# Each finished company is written (and flushed) as soon as it's ready, so a crash
+# keeps everything done so far and partial results can be watched with `tail -f`.
+# Rows are long-format: one per job posting, with the company's columns alongside (a
+# company with no jobs gets one row with empty job columns). The wide "job post1..3"
+# Data sheet is only an export view, built by to_wide(); to_long() reads it back.
+# The sink (JSONL, CSV or SQLite, by extension) can be the primary store; Parquet is
+# batch-only (see ParquetSink). The workbook is written with a streaming write-only writer.
+
+
+import csv
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+COMPANY_COLUMNS = [
+    "Company Name", "Company Description", "Website URL", "LinkedIn URL",
+    "Careers Page URL", "Job listings page URL",
+]
+POSTING_FIELDS = ["title", "URL", "location"]
+# one long-format row: a company and one of its postings
+ROW_COLUMNS = COMPANY_COLUMNS + [f"job {f}" for f in POSTING_FIELDS]
+# postings per row of the wide Data sheet
+JOBS_PER_ROW = 3
+# column order of the Data sheet
+OUTPUT_COLUMNS = COMPANY_COLUMNS + [f"job post{n} {f}" for n in range(1, JOBS_PER_ROW + 1) for f in POSTING_FIELDS]
+
+
+def company_rows(company, jobs):
+    #Company dict (Data-sheet company columns) + job dicts (title/url/location) -> long rows
+    base = {c: company.get(c, "") for c in COMPANY_COLUMNS}
+    if not jobs:
+        return [dict(base, **{"job title": "", "job URL": "", "job location": ""})]
+    return [dict(base, **{"job title": j.get("title", ""), "job URL": j.get("url", ""),
+                          "job location": j.get("location", "")}) for j in jobs]
+
+
+def trim_torn_line(path):
+    #Cut an append-only line file back to its last complete line (a crash can leave half a
+    #line at the end, and the next append would be glued onto it); returns bytes dropped
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as fh:
+        size = end = fh.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - 65536, 0)
+            fh.seek(start)
+            newline = fh.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            fh.truncate(end)
+        return size - end
+
+
+def _has_job(df, title_col, url_col):
+    return df[title_col].fillna("").astype(str).str.strip().ne("") | \
+        df[url_col].fillna("").astype(str).str.strip().ne("")
+
+
+def to_long(wide):
+    #Wide Data sheet -> long rows (vectorized: one slice per post slot, stacked)
+    wide = wide.reindex(columns=OUTPUT_COLUMNS).reset_index(drop=True)
+    parts = []
+    for n in range(1, JOBS_PER_ROW + 1):
+        part = wide[COMPANY_COLUMNS + [f"job post{n} {f}" for f in POSTING_FIELDS]]
+        part = part.set_axis(ROW_COLUMNS, axis=1).assign(_row=wide.index, _slot=n)
+        parts.append(part)
+    long = pd.concat(parts, ignore_index=True)
+    has = _has_job(long, "job title", "job URL")
+    # a company row without any posts still becomes one (post-less) long row
+    any_job = has.groupby(long["_row"]).transform("any")
+    long = long[has | (~any_job & long["_slot"].eq(1))]
+    return long.sort_values(["_row", "_slot"], kind="stable").drop(columns=["_row", "_slot"]).reset_index(drop=True)
+
+
+def to_wide(long, per_row=JOBS_PER_ROW, key=None):
+    """
+    Long rows -> the wide Data sheet, per_row postings per row (a company with more
+    postings continues on extra rows). Rows are grouped by key (a Series aligned with
+    long; the company name by default), in order of first appearance.
+    """
+    long = long.reindex(columns=ROW_COLUMNS).reset_index(drop=True)
+    if long.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    key = (long["Company Name"] if key is None else pd.Series(key)).reset_index(drop=True).fillna("")
+    group = pd.Series(pd.factorize(key)[0], index=long.index)
+    has = _has_job(long, "job title", "job URL")
+    slot = long[has].groupby(group[has]).cumcount()
+    posts = long[has].assign(_group=group[has], _line=slot // per_row, _pos=slot % per_row + 1)
+    wide = posts.pivot(index=["_group", "_line"], columns="_pos", values=[f"job {f}" for f in POSTING_FIELDS])
+    wide.columns = [f"job post{pos} {col[4:]}" for col, pos in wide.columns]
+    # company columns: first non-empty value in the group
+    firsts = long[COMPANY_COLUMNS].replace("", None).groupby(group).first()
+    lines = wide.reset_index()[["_group", "_line"]]
+    # companies without postings still get their one row
+    empty = pd.DataFrame({"_group": sorted(set(group) - set(lines["_group"])), "_line": 0})
+    lines = pd.concat([lines, empty], ignore_index=True).sort_values(["_group", "_line"])
+    out = lines.join(firsts, on="_group").join(wide, on=["_group", "_line"])
+    return out.reindex(columns=OUTPUT_COLUMNS).reset_index(drop=True)
+
+
+class JsonlSink:
+    durable = True  # every write() is on disk when it returns
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if append:
+            trim_torn_line(path)
+        self._fh = open(path, "a" if append else "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, row):
+        line = json.dumps(row, ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+
+
+class CsvSink:
+    durable = True
+
+    def __init__(self, path, append=False, columns=ROW_COLUMNS):
+        self.path = path
+        self._lock = threading.Lock()
+        if append:
+            trim_torn_line(path)
+        new_file = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self._fh = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._fh, fieldnames=columns, extrasaction="ignore")
+        if new_file:
+            self._writer.writeheader()
+        self.count = 0
+
+    def write(self, row):
+        with self._lock:
+            self._writer.writerow(row)
+            self._fh.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+
+
+class SqliteSink:
+    #One table of long rows; appends are plain INSERTs, committed per row
+    durable = True
+
+    def __init__(self, path, append=False, columns=ROW_COLUMNS):
+        self.path = path
+        self.columns = list(columns)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f'"{c}" TEXT' for c in self.columns)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS rows (id INTEGER PRIMARY KEY, {cols})")
+        if not append:
+            self._db.execute("DELETE FROM rows")
+        self._db.commit()
+        self._insert = (f"INSERT INTO rows ({', '.join(f'{chr(34)}{c}{chr(34)}' for c in self.columns)}) "
+                        f"VALUES ({', '.join('?' * len(self.columns))})")
+        self.count = 0
+
+    def write(self, row):
+        with self._lock:
+            self._db.execute(self._insert, [row.get(c) for c in self.columns])
+            self._db.commit()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ParquetSink:
+    """
+    A directory of Parquet part files. Rows are buffered and written a batch at a
+    time; appending starts a new part file instead of rewriting the old ones.
+    Needs pyarrow. Not crash-safe: buffered rows are lost and the open part file has
+    no footer until close(), so the pipeline can't use it as its journalled sink.
+    """
+
+    durable = False
+
+    def __init__(self, path, append=False, columns=ROW_COLUMNS, batch_size=500):
+        if pq is None:
+            raise ValueError("Parquet sinks need pyarrow (pip install pyarrow)")
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+        if not append:
+            for p in parts:
+                os.remove(p)
+            parts = []
+        self._schema = pa.schema([(c, pa.string()) for c in self.columns])
+        self._writer = pq.ParquetWriter(os.path.join(path, f"part-{len(parts):05d}.parquet"), self._schema)
+        self._buffer = []
+        self.count = 0
+
+    def _flush(self):
+        if self._buffer:
+            cols = {c: [None if r.get(c) is None else str(r.get(c)) for r in self._buffer] for c in self.columns}
+            self._writer.write_table(pa.table(cols, schema=self._schema))
+            self._buffer = []
+
+    def write(self, row):
+        with self._lock:
+            self._buffer.append(row)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._writer.close()
+
+
+SINKS = {".jsonl": JsonlSink, ".csv": CsvSink, ".sqlite": SqliteSink, ".parquet": ParquetSink}
+
+
+def open_sink(path, append=False, durable=False):
+    #Pick the sink class from the file extension; durable=True only allows sinks whose
+    #rows are on disk as soon as write() returns
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SINKS:
+        raise ValueError(f"Unsupported sink format: {path} (use {', '.join(SINKS)})")
+    if durable and not SINKS[ext].durable:
+        usable = ", ".join(e for e, cls in SINKS.items() if cls.durable)
+        raise ValueError(f"{ext} sinks buffer rows and can't be resumed after a crash (use {usable})")
+    return SINKS[ext](path, append=append)
+
+
+def read_sink(path):
+    #Load a sink file back as a DataFrame of long rows
+    if not os.path.exists(path) or (os.path.isfile(path) and os.path.getsize(path) == 0):
+        return pd.DataFrame(columns=ROW_COLUMNS)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        rows = []
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from an interrupted run
+        df = pd.DataFrame(rows)
+    elif ext == ".sqlite":
+        with sqlite3.connect(path) as db:
+            df = pd.read_sql_query("SELECT * FROM rows ORDER BY id", db).drop(columns="id")
+    elif ext == ".parquet":
+        # a part file left open by a crash has no footer - skip it rather than fail
+        parts = []
+        for part in sorted(glob.glob(os.path.join(path, "part-*.parquet"))):
+            try:
+                parts.append(pd.read_parquet(part))
+            except Exception:
+                continue
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=ROW_COLUMNS)
+    else:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    extra = [c for c in df.columns if c not in ROW_COLUMNS]
+    return df.reindex(columns=ROW_COLUMNS + extra)
+
+
+def _cell(value):
+    # NaN/None -> empty cell; everything else as it is
+    return None if value is None or (isinstance(value, float) and value != value) else value
+
+
+def export_xlsx(path, sheets):
+    """
+    Write {sheet name: DataFrame} to an .xlsx in one streaming pass. Uses xlsxwriter
+    (constant-memory mode) when installed, else openpyxl's write-only workbook; either
+    way rows go straight to disk instead of building the whole sheet in memory.
+    """
+    if xlsxwriter is not None:
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+        for name, df in sheets.items():
+            ws = wb.add_worksheet(name)
+            ws.write_row(0, 0, list(df.columns))
+            for i, row in enumerate(df.itertuples(index=False, name=None), start=1):
+                ws.write_row(i, 0, [_cell(v) for v in row])
+        wb.close()
+        return
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for name, df in sheets.items():
+        ws = wb.create_sheet(name)
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            ws.append([_cell(v) for v in row])
+    wb.save(path)
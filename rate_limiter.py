@@ -0,0 +1,74 @@
+# rate_limiter.py – per-host token buckets so we stay polite without global sleeps.
+# Requests to different hosts never wait on each other; requests to the same host
+# (e.g. boards.greenhouse.io) are spread out at that host's configured rate.
+
+
+import threading
+import time
+from urllib.parse import urlparse
+
+# requests/second and burst size per host; anything not listed gets DEFAULT_RATE
+DEFAULT_RATE = (2.0, 2)
+HOST_RATES = {
+    "api.duckduckgo.com": (1.0, 1),
+    "climatetechlist.com": (0.5, 1),
+    "climatebase.org": (0.5, 1),
+    "www.terra.do": (0.5, 1),
+    "workonclimate.org": (0.5, 1),
+    "boards.greenhouse.io": (3.0, 3),
+    "jobs.lever.co": (3.0, 3),
+}
+
+
+def host_of(url):
+    return (urlparse(url).hostname or "").lower()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        #Take one token; returns how long the caller has to wait before using it
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    #One token bucket per host, created lazily; safe to share across threads
+
+    def __init__(self, default_rate=DEFAULT_RATE, host_rates=None):
+        self.default_rate = default_rate
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, host, rate, burst=1):
+        with self._lock:
+            self.host_rates[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def _bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, self.default_rate)
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url):
+        #Block until this URL's host has a free slot; returns seconds waited
+        wait = self._bucket(host_of(url)).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
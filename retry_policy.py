@@ -0,0 +1,150 @@
+# retry_policy.py – when to retry, how long to wait, and when to give up on a host.
+# RetryPolicy: exponential backoff with full jitter, only for statuses/errors that can
+#   actually get better, honouring Retry-After.
+# CircuitBreaker: after enough consecutive failures a host is skipped outright for a
+#   cool-down (doubling each time it fails again), then one trial request is let through.
+# LatencyTracker: per-host latency samples; timeouts shrink to a multiple of the observed
+#   p95 so a slow host doesn't cost the full default timeout on every request.
+
+
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    #Raised (returned) instead of making a request to a host whose breaker is open
+    pass
+
+
+class HostUnreachableError(requests.exceptions.ConnectionError):
+    #Returned instead of making a request to a host that recently failed DNS / connect
+    pass
+
+
+def host_unreachable(exc):
+    #True for a DNS lookup or TCP connect failure (urllib3 NewConnectionError, which
+    #NameResolutionError subclasses): the host itself is gone, not just this request.
+    #Resets, dropped keep-alive sockets and timeouts are not - those get retried.
+    if not isinstance(exc, requests.exceptions.ConnectionError) \
+            or isinstance(exc, requests.exceptions.ConnectTimeout):
+        return False
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, NewConnectionError):
+            return True
+        # requests wraps urllib3's MaxRetryError, which keeps the real error in .reason
+        exc = getattr(exc, "reason", None) or (exc.args[0] if exc.args and isinstance(exc.args[0], BaseException)
+                                               else None)
+    return False
+
+
+class RetryPolicy:
+    def __init__(self, base_delay=0.5, max_delay=20.0, max_retry_after=60.0, retry_statuses=None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # a server asking us to wait longer than this is treated as a failure, not a retry
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = set(RETRY_STATUSES if retry_statuses is None else retry_statuses)
+
+    def should_retry_status(self, status):
+        return status in self.retry_statuses
+
+    def retryable_error(self, exc):
+        # timeouts (ConnectTimeout included) and dropped/reset connections can succeed next
+        # time; bad URLs, SSL errors and hosts that don't resolve or refuse connections won't
+        return isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)) \
+            and not isinstance(exc, requests.exceptions.SSLError) and not host_unreachable(exc)
+
+    @staticmethod
+    def parse_retry_after(value):
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, retry_after=None):
+        #Seconds to sleep before attempt+1, or None to stop retrying
+        wait = self.parse_retry_after(retry_after)
+        if wait is not None:
+            return wait if wait <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._hosts = {}  # host -> [consecutive_failures, open_until, current_cooldown, trial_in_flight]
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            st = self._hosts.get(host)
+            if st is None or st[0] < self.threshold:
+                return True
+            if time.monotonic() < st[1] or st[3]:
+                return False
+            st[3] = True  # half-open: this caller is the trial request
+            return True
+
+    def record(self, host, ok):
+        with self._lock:
+            st = self._hosts.setdefault(host, [0, 0.0, self.cooldown, False])
+            st[3] = False
+            if ok:
+                st[0], st[2] = 0, self.cooldown
+                return
+            st[0] += 1
+            if st[0] >= self.threshold:
+                if st[1]:  # failed again after a cool-down: back off harder
+                    st[2] = min(st[2] * 2, self.max_cooldown)
+                st[1] = time.monotonic() + st[2]
+
+    def open_hosts(self):
+        now = time.monotonic()
+        with self._lock:
+            return [h for h, st in self._hosts.items() if st[0] >= self.threshold and st[1] > now]
+
+
+class LatencyTracker:
+    def __init__(self, window=50, min_samples=5, multiplier=3.0, floor=3.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.floor = floor
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, host, seconds):
+        with self._lock:
+            self._samples.setdefault(host, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, host, pct):
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * pct / 100), len(samples) - 1)]
+
+    def timeout_for(self, host, ceiling):
+        #multiplier x p95 of recent latencies, between floor and the caller's timeout
+        with self._lock:
+            enough = len(self._samples.get(host, ())) >= self.min_samples
+        if not enough:
+            return ceiling
+        return max(self.floor, min(ceiling, self.percentile(host, 95) * self.multiplier))
@@ -0,0 +1,68 @@
+# seen_index.py – remembers which board postings we've already collected, across runs.
+# Postings are keyed by canonical URL with a hash of their content (title, company,
+# location), so a re-run can tell new and changed postings from ones it already has and
+# a source can stop paginating once it reaches a page with nothing new on it.
+
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+from dedup import canonical_url
+
+INDEX_FILE = ".seen_postings.sqlite"
+
+
+def content_hash(job):
+    text = "\x1f".join((job.title or "", job.company or "", job.location or "")).lower()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SeenIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                board TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )""")
+        self._db.commit()
+
+    def split(self, jobs):
+        #-> (new or changed jobs, jobs we already have unchanged)
+        keys = [canonical_url(j.url) for j in jobs]
+        with self._lock:
+            known = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                known.update(self._db.execute(
+                    f"SELECT url, hash FROM seen WHERE url IN ({','.join('?' * len(chunk))})", chunk))
+        fresh, old = [], []
+        for key, job in zip(keys, jobs):
+            (old if known.get(key) == content_hash(job) else fresh).append(job)
+        return fresh, old
+
+    def mark(self, jobs):
+        #Record jobs as collected (or still there); first_seen survives updates
+        now = time.time()
+        rows = [(canonical_url(j.url), content_hash(j), j.board, now, now) for j in jobs]
+        with self._lock:
+            self._db.executemany("""
+                INSERT INTO seen (url, hash, board, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET hash = excluded.hash, last_seen = excluded.last_seen""", rows)
+            self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
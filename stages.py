@@ -0,0 +1,134 @@
+# stages.py – small bounded-queue stage runner for the pipeline.
+# Each stage has its own worker pool and input queue; a full queue blocks the stage
+# feeding it (backpressure), so a slow stage can't pile up unbounded work.
+# Queue depth and throughput per stage are logged while it runs; per-item time goes to
+# the stage_seconds histogram in metrics.py.
+
+
+import queue
+import threading
+import time
+import logging
+
+from metrics import get_metrics
+
+logger = logging.getLogger("stages")
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=4, queue_size=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size or workers * 2)
+        self.next = None
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def stats(self, elapsed):
+        with self._lock:
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "queued": self.queue.qsize(),
+                "processed": self.processed,
+                "failed": self.failed,
+                "per_sec": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                # share of worker time spent inside func - near 100% means add workers
+                "utilization": round(self.busy / (elapsed * self.workers), 2) if elapsed > 0 else 0.0,
+            }
+
+
+class StagedPipeline:
+    def __init__(self, stages, report_every=30, stop_event=None):
+        self.stages = stages
+        for a, b in zip(stages, stages[1:]):
+            a.next = b
+        self.report_every = report_every
+        self.stop_event = stop_event or threading.Event()
+        self._started = None
+
+    def stop(self):
+        #Stop feeding and drop queued work; in-flight items finish
+        self.stop_event.set()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def _put(self, stage, item):
+        # blocking put that still notices stop() while waiting on a full queue
+        while not self.stopped:
+            try:
+                stage.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self, stage):
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                return
+            if self.stopped:
+                continue  # drain without working
+            start = time.monotonic()
+            try:
+                out = stage.func(item)
+                ok = True
+            except Exception as e:
+                logger.error(f" Stage {stage.name} failed: {e}")
+                out, ok = None, False
+            took = time.monotonic() - start
+            get_metrics().observe("stage_seconds", took, stage=stage.name)
+            with stage._lock:
+                stage.busy += took
+                stage.processed += ok
+                stage.failed += not ok
+            if out is not None and stage.next is not None:
+                self._put(stage.next, out)
+
+    def _reporter(self):
+        while not self._finished.wait(self.report_every):
+            self.log_stats()
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return [s.stats(elapsed) for s in self.stages]
+
+    def log_stats(self):
+        for st in self.stats():
+            logger.info(f" [{st['stage']}] queued={st['queued']} done={st['processed']} failed={st['failed']} "
+                        f"{st['per_sec']}/s util={st['utilization']:.0%}")
+
+    def run(self, items):
+        #Feed items into the first stage and block until every stage has drained
+        self._started = time.monotonic()
+        self._finished = threading.Event()
+        for stage in self.stages:
+            stage._threads = [threading.Thread(target=self._worker, args=(stage,), daemon=True,
+                                               name=f"{stage.name}-{i}") for i in range(stage.workers)]
+            for t in stage._threads:
+                t.start()
+        reporter = threading.Thread(target=self._reporter, daemon=True)
+        reporter.start()
+
+        for item in items:
+            if not self._put(self.stages[0], item):
+                break
+        # shut stages down front to back so nothing downstream closes early
+        for stage in self.stages:
+            for _ in stage._threads:
+                stage.queue.put(_DONE)
+            for t in stage._threads:
+                t.join()
+
+        self._finished.set()
+        self.log_stats()
+        return self.stats()
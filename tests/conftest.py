@@ -0,0 +1,97 @@
+# conftest.py – shared fixtures: the repo root on sys.path, a local stub HTTP server
+# and a FetchEngine pointed at it with politeness delays turned off.
+
+
+import os
+import socket
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetcher import FetchEngine  # noqa: E402
+from rate_limiter import HostRateLimiter  # noqa: E402
+from retry_policy import RetryPolicy, CircuitBreaker  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # answers from server.routes: path -> list of (status, headers, body), used in order
+    # (the last one repeats); "reset" instead of a tuple drops the connection with an RST
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, with_body):
+        self.server.calls.append((self.command, self.path, dict(self.headers)))
+        script = self.server.routes.get(self.path.split("?")[0], [(404, {}, "not found")])
+        step = script.pop(0) if len(script) > 1 else script[0]
+        if step == "reset":
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.close_connection = True
+            return
+        status, headers, body = step
+        if callable(body):
+            status, headers, body = body(self.headers)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.routes = {}
+        self.calls = []
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    def hits(self, path):
+        return sum(1 for _, p, _ in self.calls if p.split("?")[0] == path)
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_engine():
+    # FetchEngine with no rate limiting and millisecond backoff, so retries don't slow the suite
+    engines = []
+
+    def make(**kwargs):
+        kwargs.setdefault("limiter", HostRateLimiter(default_rate=(1000.0, 1000), host_rates={}))
+        kwargs.setdefault("policy", RetryPolicy(base_delay=0.01, max_delay=0.05))
+        kwargs.setdefault("breaker", CircuitBreaker(threshold=5, cooldown=60.0))
+        kwargs.setdefault("retries", 3)
+        kwargs.setdefault("dns_cache", False)
+        engine = FetchEngine(**kwargs)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.close()
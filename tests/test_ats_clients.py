@@ -0,0 +1,46 @@
+# test_ats_clients.py – careers/ATS URL -> board target.
+
+
+import pytest
+
+from ats_clients import parse_ats_url
+
+
+@pytest.mark.parametrize("url, platform, token", [
+    ("https://boards.greenhouse.io/acme", "greenhouse", "acme"),
+    ("https://job-boards.greenhouse.io/acme/jobs/123", "greenhouse", "acme"),
+    ("https://boards.eu.greenhouse.io/acme", "greenhouse", "acme"),
+    ("https://boards.greenhouse.io/embed/job_board?for=acme", "greenhouse", "acme"),
+    ("https://boards-api.greenhouse.io/v1/boards/acme/jobs", "greenhouse", "acme"),
+    ("https://jobs.lever.co/acme", "lever", "acme"),
+    ("https://api.eu.lever.co/v0/postings/acme?mode=json", "lever", "acme"),
+    ("https://jobs.ashbyhq.com/acme", "ashby", "acme"),
+    ("https://acme.wd5.myworkdayjobs.com/en-US/External", "workday", "acme"),
+    ("https://jobs.smartrecruiters.com/Acme", "smartrecruiters", "Acme"),
+    ("https://apply.workable.com/acme/", "workable", "acme"),
+    ("https://acme.recruitee.com/", "recruitee", "acme"),
+    ("https://acme.bamboohr.com/careers", "bamboohr", "acme"),
+])
+def test_board_urls(url, platform, token):
+    target = parse_ats_url(url)
+    assert (target.platform, target.token) == (platform, token)
+
+
+def test_workday_site():
+    target = parse_ats_url("https://acme.wd5.myworkdayjobs.com/en-US/External/job/Berlin/123")
+    assert target.site == "External" and target.board_url == "https://acme.wd5.myworkdayjobs.com/External"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.greenhouse.io/privacy-policy",
+    "https://greenhouse.io/",
+    "https://support.greenhouse.io/hc/en-us",
+    "https://www.bamboohr.com/pricing",
+    "https://app.bamboohr.com/login",
+    "https://www.recruitee.com/",
+    "https://www.lever.co/",
+    "https://acme.com/careers",
+    "",
+])
+def test_vendor_and_company_sites_are_not_boards(url):
+    assert parse_ats_url(url) is None
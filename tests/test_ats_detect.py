@@ -0,0 +1,55 @@
+# test_ats_detect.py – finding the board behind a careers page's source.
+
+
+from ats_detect import AtsDetector, cache_key, scan_page
+from html_parser import Document
+
+FOOTER = '<footer><a href="https://boards.greenhouse.io/privacy">Powered by Greenhouse</a></footer>'
+
+
+def test_embed_script_beats_an_earlier_footer_link():
+    page = FOOTER + '<script src="https://boards.greenhouse.io/embed/job_board/js?for=acme"></script>'
+    target = scan_page(page)
+    assert (target.platform, target.token) == ("greenhouse", "acme")
+
+
+def test_embed_signature_beats_a_plain_link():
+    page = ('<a href="https://jobs.lever.co/other">Partner jobs</a>'
+            '<script>Grnhse.Settings.boardToken = "acme";</script>')
+    assert scan_page(page).token == "acme"
+
+
+def test_posting_link_beats_a_board_root_link():
+    page = ('<a href="https://jobs.lever.co/vendor">Lever</a>'
+            '<a href="https://jobs.lever.co/acme/0f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b">Engineer</a>')
+    assert scan_page(page).token == "acme"
+
+
+def test_vendor_pages_are_not_boards():
+    assert scan_page(FOOTER) is None
+
+
+def test_most_mentioned_board_wins():
+    page = ('<a href="https://jobs.lever.co/acme/0f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b">A</a>'
+            '<a href="https://jobs.lever.co/beta/1f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b">B</a>'
+            '<a href="https://jobs.lever.co/beta/2f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b">C</a>')
+    assert scan_page(page).token == "beta"
+
+
+def test_json_escaped_urls():
+    assert scan_page('{"url": "https:\\/\\/jobs.ashbyhq.com\\/acme\\/0f1e2d3c"}').token == "acme"
+
+
+def test_shared_hosts_are_cached_per_url():
+    assert cache_key("https://www.notion.so/acme/Careers-123") == "https://www.notion.so/acme/Careers-123"
+    assert cache_key("https://acme.com/careers") == "acme.com"
+
+
+def test_hits_are_reused_per_domain_but_not_on_shared_hosts():
+    detector = AtsDetector()
+    page = '<script src="https://boards.greenhouse.io/embed/job_board/js?for=acme"></script>'
+    doc = Document("https://acme.com/careers", page)
+    assert detector.detect("https://acme.com/careers", doc).token == "acme"
+    assert detector.detect("https://acme.com/jobs").token == "acme"
+    detector.detect("https://www.notion.so/acme/Careers", Document("https://www.notion.so/acme/Careers", page))
+    assert detector.detect("https://www.notion.so/beta/Careers") is None
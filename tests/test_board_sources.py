@@ -0,0 +1,76 @@
+# test_board_sources.py – the board scheduler's quota, dedup and incremental (seen index) runs.
+
+
+import pytest
+
+from board_sources import BoardScheduler, BoardSource, JobRecord
+from extra_boards import parse_remotive
+from seen_index import SeenIndex
+
+
+def _source(name, count, pages=1, limit=100):
+    def parse(body):
+        page = int(body)
+        return [JobRecord(f"{name} role {page}-{i}", f"{name} Co {i}", "Remote",
+                          f"https://{name.lower()}.example/job/{page}-{i}", name) for i in range(count)]
+
+    src = BoardSource(name, f"https://{name.lower()}.example/jobs?page={{page}}", parse, pages=pages, limit=limit)
+    src.fetch_page = lambda page: str(page)
+    return src
+
+
+@pytest.fixture
+def seen(tmp_path):
+    index = SeenIndex(path=str(tmp_path / "seen.sqlite"))
+    yield index
+    index.close()
+
+
+def test_quota_and_per_source_limit():
+    jobs = BoardScheduler(sources=[_source("A", 10, pages=3, limit=15), _source("B", 10, pages=3)], quota=25).run()
+    assert len(jobs) == 25
+    assert sum(j.board == "A" for j in jobs) <= 15
+
+
+def test_duplicates_across_sources_are_dropped():
+    a, b = _source("A", 3), _source("A", 3)
+    b.name = "A mirror"
+    assert len(BoardScheduler(sources=[a, b], quota=100).run()) == 3
+
+
+def test_incremental_run_skips_known_postings(seen):
+    first = BoardScheduler(sources=[_source("A", 5, pages=3)], quota=100, seen=seen)
+    jobs = first.run()
+    assert len(jobs) == 15
+    # nothing is marked until the caller has stored the postings
+    assert seen.count() == 0
+    seen.mark(jobs)
+    second = BoardScheduler(sources=[_source("A", 5, pages=3)], quota=100, seen=seen)
+    assert second.run() == []
+    # page 1 had nothing new, so later pages weren't read
+    assert len(second.known) == 5
+
+
+def test_a_broken_parser_only_loses_its_own_source():
+    def parse(body):
+        raise KeyError("title")
+
+    broken = BoardSource("Broken", "https://broken.example/", parse)
+    broken.fetch_page = lambda page: "{}"
+    assert broken.scrape() == []
+    jobs = BoardScheduler(sources=[broken, _source("A", 4)], quota=100).run()
+    assert len(jobs) == 4
+
+
+@pytest.mark.parametrize("body, count", [
+    ('{"jobs": [{"title": "Engineer", "company_name": "Acme", "url": "https://remotive.com/1"},'
+     ' {"title": "No URL", "company_name": "Acme"}, {"company_name": "No title", "url": "https://remotive.com/2"},'
+     ' "junk", {"title": "No company", "url": "https://remotive.com/3"}]}', 2),
+    ('[1, 2, 3]', 0),
+    ('{"jobs": null}', 0),
+    ('not json', 0),
+])
+def test_remotive_skips_incomplete_items(body, count):
+    jobs = parse_remotive(body)
+    assert len(jobs) == count
+    assert all(j.title and j.url for j in jobs)
@@ -0,0 +1,44 @@
+# test_checkpoint.py – the per-company stage journal behind --resume.
+
+
+from checkpoint import CheckpointJournal
+
+
+def test_resume_keeps_recorded_stages(tmp_path):
+    path = str(tmp_path / "run.checkpoint.jsonl")
+    journal = CheckpointJournal(path)
+    journal.record("Acme Inc.", "enriched", {"website": "https://acme.com"})
+    journal.record("Acme Inc.", "written", 3)
+    journal.close()
+    resumed = CheckpointJournal(path, resume=True)
+    assert resumed.done("acme inc", "written")
+    assert resumed.data("Acme Inc.", "enriched") == {"website": "https://acme.com"}
+    assert resumed.total("written") == 3
+    resumed.close()
+
+
+def test_fresh_run_starts_empty(tmp_path):
+    path = str(tmp_path / "run.checkpoint.jsonl")
+    journal = CheckpointJournal(path)
+    journal.record("Acme", "written", 1)
+    journal.close()
+    fresh = CheckpointJournal(path)
+    assert fresh.count("written") == 0
+    fresh.close()
+
+
+def test_resume_after_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "run.checkpoint.jsonl")
+    journal = CheckpointJournal(path)
+    journal.record("Acme", "written", 2)
+    journal.close()
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"key": "beta", "stage": "wri')  # killed mid-write
+    resumed = CheckpointJournal(path, resume=True)
+    assert not resumed.done("Beta", "written")
+    resumed.record("Beta", "written", 1)
+    resumed.close()
+    again = CheckpointJournal(path, resume=True)
+    assert again.done("Acme", "written") and again.done("Beta", "written")
+    assert again.total("written") == 3
+    again.close()
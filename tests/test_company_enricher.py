@@ -0,0 +1,92 @@
+# test_company_enricher.py – enrich_company's use of the enrichment store.
+
+
+import time
+
+import pytest
+
+from company_enricher import CompanyEnricher
+from enrichment_store import DAY, EnrichmentStore
+
+GOOD = {"website": ("https://acme.com", 0.8), "linkedin": ("https://linkedin.com/company/acme", 0.9),
+        "careers_page": ("https://acme.com/careers", 0.9), "job_listings_url": ("https://jobs.lever.co/acme", 0.9)}
+
+
+class OfflineEnricher(CompanyEnricher):
+    # every lookup answers from self.found (None = the search came back empty)
+
+    def __init__(self, store, found):
+        super().__init__(fetcher=object(), store=store, concurrent_probes=False)
+        self.found = found
+        self.calls = []
+
+    def _answer(self, field):
+        self.calls.append(field)
+        value = self.found.get(field)
+        return value, (0.8 if value else 0.0)
+
+    def _find_website_scored(self, company):
+        return self._answer("website")
+
+    def find_linkedin(self, company):
+        return self._answer("linkedin")[0]
+
+    def _find_careers_page_scored(self, website, docs=None):
+        return self._answer("careers_page")
+
+    def _detect_job_board_scored(self, url, docs=None):
+        return self._answer("job_listings_url")
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = EnrichmentStore(path=str(tmp_path / "enrich.sqlite"))
+    yield s
+    s.close()
+
+
+def _age(store, name, days):
+    # pretend everything stored for name was fetched days ago
+    for rec in store.get(name).values():
+        rec.fetched_at = time.time() - days * DAY
+
+
+def test_fresh_fields_are_not_looked_up_again(store):
+    store.put("Acme", GOOD)
+    enricher = OfflineEnricher(store, {})
+    data = enricher.enrich_company("Acme")
+    assert enricher.calls == []
+    assert data["website"] == "https://acme.com" and data["job_listings_url"] == "https://jobs.lever.co/acme"
+
+
+def test_empty_re_lookup_keeps_the_stored_values(store):
+    store.put("Acme", GOOD)
+    _age(store, "Acme", 60)
+    # the search is down: every lookup comes back empty
+    enricher = OfflineEnricher(store, {})
+    data = enricher.enrich_company("Acme")
+    assert set(enricher.calls) == set(GOOD)
+    assert data["website"] == "https://acme.com"
+    assert data["careers_page"] == "https://acme.com/careers"
+    assert data["job_listings_url"] == "https://jobs.lever.co/acme"
+    stored = store.get("Acme")
+    assert stored["website"].value == "https://acme.com"
+    assert stored["website"].confidence == pytest.approx(0.4)
+    assert stored["careers_page"].is_fresh("careers_page")
+
+
+def test_new_website_replaces_derived_fields(store):
+    store.put("Acme", GOOD)
+    _age(store, "Acme", 60)
+    enricher = OfflineEnricher(store, {"website": "https://acme.io"})
+    data = enricher.enrich_company("Acme")
+    assert data["website"] == "https://acme.io"
+    # the old careers page belonged to the old site - a miss on the new one is a miss
+    assert data["careers_page"] is None and data["job_listings_url"] is None
+
+
+def test_first_lookup_misses_are_stored(store):
+    enricher = OfflineEnricher(store, {"website": "https://acme.com"})
+    data = enricher.enrich_company("Acme")
+    assert data["careers_page"] is None
+    assert store.get("Acme")["careers_page"].value is None
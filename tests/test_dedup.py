@@ -0,0 +1,75 @@
+# test_dedup.py – canonical URLs and the streaming de-duplicator.
+
+
+import pytest
+
+from dedup import Deduplicator, canonical_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.acme.com/jobs/1/?utm_source=x&gclid=abc#apply", "https://acme.com/jobs/1"),
+    ("http://ACME.com/jobs?b=2&a=1&ref=board", "https://acme.com/jobs?a=1&b=2"),
+    ("acme.com", "https://acme.com/"),
+    ("https://job-boards.greenhouse.io/acme/jobs/123?gh_src=x", "https://boards.greenhouse.io/acme/jobs/123"),
+    ("https://boards.eu.greenhouse.io/acme/jobs/123", "https://boards.greenhouse.io/acme/jobs/123"),
+    ("https://boards.greenhouse.io/embed/job_app?for=acme&token=123", "https://boards.greenhouse.io/acme/jobs/123"),
+    ("https://jobs.eu.lever.co/acme/0f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b/apply",
+     "https://jobs.lever.co/acme/0f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b"),
+    ("https://apply.workable.com/acme/j/ABC123/apply", "https://apply.workable.com/acme/j/ABC123"),
+    ("", ""),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_same_url_is_a_duplicate():
+    d = Deduplicator()
+    assert d.add("Software Engineer", "Acme", "https://acme.com/jobs/1?utm_source=board")
+    assert not d.add("Senior Software Engineer", "Acme Inc", "https://www.acme.com/jobs/1/")
+    assert d.duplicates == 1
+
+
+def test_same_job_on_another_host_is_a_duplicate():
+    d = Deduplicator()
+    assert d.add("Senior Battery Engineer", "Acme", "https://climatebase.org/job/555")
+    assert not d.add("Senior Battery Engineer", "Acme Inc.", "https://boards.greenhouse.io/acme/jobs/9")
+
+
+def test_same_title_without_url_is_a_duplicate():
+    d = Deduplicator()
+    assert d.add("Senior Battery Engineer", "Acme", "https://boards.greenhouse.io/acme/jobs/9")
+    assert not d.add("Senior Battery Engineer", "Acme", None)
+
+
+def test_same_title_on_one_host_are_distinct_postings():
+    d = Deduplicator()
+    for n in range(1, 5):
+        assert d.add("Software Engineer", "Acme", f"https://boards.greenhouse.io/acme/jobs/{n}")
+    assert d.duplicates == 0
+
+
+def test_other_companies_and_titles_are_kept():
+    d = Deduplicator()
+    assert d.add("Senior Battery Engineer", "Acme", "https://acme.com/jobs/1")
+    assert d.add("Senior Battery Engineer", "Beta", "https://beta.com/jobs/1")
+    assert d.add("Head of Finance", "Acme", "https://climatebase.org/job/7")
+
+
+def test_unknown_company_never_fuzzy_matches():
+    d = Deduplicator()
+    assert d.add("Software Engineer", "Unknown", "https://a.example/1")
+    assert d.add("Software Engineer", "Unknown", "https://b.example/2")
+
+
+@pytest.mark.parametrize("title", ["软件工程师", "エンジニア", "—", "!!"])
+def test_titles_without_latin_letters(title):
+    d = Deduplicator()
+    assert d.add(title, "Acme", "https://acme.com/jobs/1")
+    assert d.add(title, "Acme", "https://acme.com/jobs/2")
+    assert not d.add(title, "Acme", "https://acme.com/jobs/1")
+
+
+def test_non_latin_titles_fuzzy_match_across_hosts():
+    d = Deduplicator()
+    assert d.add("高级软件工程师", "Acme", "https://climatebase.org/job/1")
+    assert not d.add("高级软件工程师", "Acme", "https://boards.greenhouse.io/acme/jobs/1")
@@ -0,0 +1,120 @@
+# test_fetcher.py – FetchEngine retry, circuit-breaker and cache paths against a local stub server.
+
+
+import socket
+
+from http_cache import HttpCache
+from retry_policy import CircuitBreaker, CircuitOpenError, HostUnreachableError
+
+OK = (200, {}, "ok")
+
+
+def test_retries_503_then_succeeds(stub, make_engine):
+    stub.routes["/flaky"] = [(503, {}, "busy"), (503, {}, "busy"), OK]
+    res = make_engine().fetch(stub.url("/flaky"))
+    assert res.ok and res.text == "ok"
+    assert stub.hits("/flaky") == 3
+
+
+def test_gives_up_after_retries(stub, make_engine):
+    stub.routes["/down"] = [(503, {}, "busy")]
+    res = make_engine(retries=2).fetch(stub.url("/down"))
+    assert res.status == 503
+    assert stub.hits("/down") == 2
+
+
+def test_client_errors_are_not_retried(stub, make_engine):
+    res = make_engine().fetch(stub.url("/missing"))
+    assert res.status == 404
+    assert stub.hits("/missing") == 1
+
+
+def test_retry_after_over_the_limit_stops_retrying(stub, make_engine):
+    stub.routes["/slow-down"] = [(429, {"Retry-After": "3600"}, "later"), OK]
+    res = make_engine().fetch(stub.url("/slow-down"))
+    assert res.status == 429
+    assert stub.hits("/slow-down") == 1
+
+
+def test_connection_reset_is_retried(stub, make_engine):
+    stub.routes["/reset"] = ["reset", OK]
+    engine = make_engine()
+    res = engine.fetch(stub.url("/reset"))
+    assert res.ok and res.text == "ok"
+    assert stub.hits("/reset") == 2
+    # a reset is not a dead host
+    assert not engine.is_unreachable(stub.url("/"))
+
+
+def test_refused_connection_marks_host_unreachable(make_engine):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()  # nothing listens on this port now
+    engine = make_engine()
+    first = engine.fetch(f"http://127.0.0.1:{port}/a")
+    assert first.status == 0 and first.error is not None
+    assert engine.is_unreachable(f"http://127.0.0.1:{port}/b")
+    second = engine.fetch(f"http://127.0.0.1:{port}/b")
+    assert isinstance(second.error, HostUnreachableError)
+
+
+def test_breaker_opens_and_skips_host(stub, make_engine):
+    stub.routes["/down"] = [(500, {}, "error")]
+    engine = make_engine(retries=1, breaker=CircuitBreaker(threshold=3, cooldown=60.0))
+    for _ in range(3):
+        assert engine.fetch(stub.url("/down")).status == 500
+    assert stub.hits("/down") == 3
+    res = engine.fetch(stub.url("/other"))
+    assert isinstance(res.error, CircuitOpenError)
+    assert stub.hits("/other") == 0
+
+
+def test_breaker_lets_a_trial_through_after_cooldown(stub, make_engine):
+    stub.routes["/down"] = [(500, {}, "error"), OK]
+    engine = make_engine(retries=1, breaker=CircuitBreaker(threshold=1, cooldown=0.0))
+    assert engine.fetch(stub.url("/down")).status == 500
+    assert engine.fetch(stub.url("/down")).ok
+    assert engine.breaker.open_hosts() == []
+
+
+def test_cache_hit_skips_the_network(stub, make_engine, tmp_path):
+    stub.routes["/page"] = [(200, {}, "cached body")]
+    engine = make_engine(cache=HttpCache(path=str(tmp_path / "cache.sqlite")))
+    first = engine.fetch(stub.url("/page"))
+    second = engine.fetch(stub.url("/page"))
+    assert not first.from_cache and second.from_cache
+    assert second.text == "cached body"
+    assert stub.hits("/page") == 1
+
+
+def test_errors_are_not_cached(stub, make_engine, tmp_path):
+    stub.routes["/broken"] = [(500, {}, "error"), (200, {}, "fixed")]
+    engine = make_engine(retries=1, cache=HttpCache(path=str(tmp_path / "cache.sqlite")))
+    assert engine.fetch(stub.url("/broken")).status == 500
+    assert engine.fetch(stub.url("/broken")).text == "fixed"
+
+
+def test_stale_entry_revalidated_with_etag(stub, make_engine, tmp_path):
+    def conditional(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, ""
+        return 200, {"ETag": '"v1"'}, "versioned body"
+
+    stub.routes["/etag"] = [(200, {}, conditional)]
+    # default_ttl=0: every stored entry is stale at once, so each fetch revalidates
+    engine = make_engine(cache=HttpCache(path=str(tmp_path / "cache.sqlite"), default_ttl=0))
+    first = engine.fetch(stub.url("/etag"))
+    second = engine.fetch(stub.url("/etag"))
+    assert first.text == second.text == "versioned body"
+    assert second.from_cache
+    assert stub.hits("/etag") == 2
+    assert stub.calls[-1][2].get("If-None-Match") == '"v1"'
+
+
+def test_head_requests_bypass_the_cache(stub, make_engine, tmp_path):
+    stub.routes["/head"] = [OK]
+    engine = make_engine(cache=HttpCache(path=str(tmp_path / "cache.sqlite")))
+    assert engine.fetch(stub.url("/head"), method="HEAD").status == 200
+    assert engine.fetch(stub.url("/head"), method="HEAD").status == 200
+    assert stub.hits("/head") == 2
@@ -0,0 +1,57 @@
+# test_job_scraper.py – JobBoardScraper's choice between ATS feeds and HTML parsers.
+
+
+from html_parser import Document
+from job_scraper import JobBoardScraper
+
+GREENHOUSE_EMBED = """<html><body>
+<script src="https://boards.greenhouse.io/embed/job_board/js?for={token}"></script>
+<div class="opening"><a href="/jobs/1">Hydrologist</a></div>
+<div class="opening"><a href="/jobs/2">Battery Chemist</a></div>
+</body></html>"""
+
+
+class NoFeeds:
+    # a fetcher whose ATS feeds are all empty and that must not be asked for pages
+    def get_json(self, url, **kwargs):
+        return None
+
+    def fetch(self, url, **kwargs):
+        raise AssertionError(f"unexpected fetch of {url}")
+
+
+def test_feed_postings_come_first():
+    class Feed(NoFeeds):
+        def get_json(self, url, **kwargs):
+            return {"jobs": [{"title": "Feed Engineer", "absolute_url": "https://boards.greenhouse.io/acme/jobs/1",
+                              "location": {"name": "Berlin"}}]}
+
+    jobs = JobBoardScraper(fetcher=Feed()).scrape_company_jobs("https://boards.greenhouse.io/acme", "Acme")
+    assert jobs == [{"title": "Feed Engineer", "url": "https://boards.greenhouse.io/acme/jobs/1",
+                     "location": "Berlin"}]
+
+
+def test_detected_platform_picks_the_html_parser():
+    url = "https://embedder-one.example/careers"
+    doc = Document(url, GREENHOUSE_EMBED.format(token="embedder-one"))
+    scraper = JobBoardScraper(fetcher=NoFeeds())
+    jobs = scraper.scrape_company_jobs(url, "Embedder", docs={url: doc})
+    assert doc.platform == "greenhouse"
+    assert [j["title"] for j in jobs] == ["Hydrologist", "Battery Chemist"]
+    assert jobs[0]["url"] == "https://embedder-one.example/jobs/1"
+
+
+def test_platform_from_the_enricher_is_used():
+    url = "https://embedder-two.example/careers"
+    html = '<div class="opening"><a href="/jobs/7">Hydrologist</a></div>'
+    doc = Document(url, html, platform="greenhouse")
+    jobs = JobBoardScraper(fetcher=NoFeeds()).scrape_company_jobs(url, "Embedder", docs={url: doc})
+    assert [j["title"] for j in jobs] == ["Hydrologist"]
+
+
+def test_generic_fallback_when_the_platform_parser_finds_nothing():
+    url = "https://embedder-three.example/careers"
+    html = '<a href="/roles/1">Senior Software Engineer</a><a href="/blog">Blog</a>'
+    doc = Document(url, html, platform="lever")
+    jobs = JobBoardScraper(fetcher=NoFeeds()).scrape_company_jobs(url, "Embedder", docs={url: doc})
+    assert [j["url"] for j in jobs] == ["https://embedder-three.example/roles/1"]
@@ -0,0 +1,86 @@
+# test_job_store.py – upserts into the companies/postings store and the exported view.
+
+
+import pytest
+
+from board_sources import JobRecord
+from job_store import JobStore
+from output_sink import company_rows
+
+ACME = {"Company Name": "Acme", "Company Description": "Batteries", "Website URL": "https://acme.com",
+        "Careers Page URL": "https://acme.com/careers"}
+
+
+def _job(title, url, location="Remote"):
+    return {"title": title, "url": url, "location": location}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = JobStore(path=str(tmp_path / "jobs.sqlite"))
+    s.begin_run()
+    yield s
+    s.close()
+
+
+def test_upsert_counts_new_and_known(store):
+    rows = company_rows(ACME, [_job("Battery Engineer", "https://acme.com/jobs/1")])
+    assert store.upsert(rows) == (1, 0)
+    # same posting behind a tracking parameter
+    rows = company_rows(ACME, [_job("Battery Engineer", "https://acme.com/jobs/1?utm_source=x", "Berlin")])
+    assert store.upsert(rows) == (0, 1)
+    assert store.count() == 1
+    assert store.frame()["job location"].tolist() == ["Berlin"]
+
+
+def test_same_title_on_one_host_are_separate_postings(store):
+    jobs = [_job("Software Engineer", f"https://boards.greenhouse.io/acme/jobs/{n}", f"City {n}") for n in range(4)]
+    assert store.upsert(company_rows(ACME, jobs)) == (4, 0)
+    assert sorted(store.frame()["job location"]) == [f"City {n}" for n in range(4)]
+
+
+def test_same_job_from_a_board_is_merged(store):
+    store.upsert(company_rows(ACME, [_job("Senior Battery Engineer", "https://boards.greenhouse.io/acme/jobs/9")]))
+    board = JobRecord("Senior Battery Engineer", "Acme", "Remote", "https://climatebase.org/job/555", "Climatebase")
+    assert store.upsert([board.to_row()]) == (0, 1)
+    assert store.count() == 1
+
+
+def test_board_rows_keep_stored_company_details(store):
+    store.upsert(company_rows(ACME, [_job("Battery Engineer", "https://acme.com/jobs/1")]))
+    board = JobRecord("Head of Sales", "Acme", "Remote", "https://climatebase.org/job/7", "Climatebase")
+    store.upsert([board.to_row()])
+    company = store.frame().iloc[0]
+    assert company["Company Description"] == "Batteries"
+    assert company["Careers Page URL"] == "https://acme.com/careers"
+
+
+@pytest.mark.parametrize("title", ["软件工程师", "—"])
+def test_titles_without_latin_letters(store, title):
+    rows = company_rows(ACME, [_job(title, "https://acme.com/jobs/1"), _job(title, "https://acme.com/jobs/2")])
+    assert store.upsert(rows) == (2, 0)
+
+
+def test_touch_keeps_known_postings_in_the_view(store):
+    store.upsert(company_rows(ACME, [_job("Battery Engineer", "https://acme.com/jobs/1")]))
+    store.begin_run()
+    assert store.frame()["job title"].dropna().tolist() == []
+    assert store.touch(["https://www.acme.com/jobs/1/"]) == 1
+    assert store.frame()["job title"].tolist() == ["Battery Engineer"]
+
+
+def test_view_is_three_posts_per_row(store):
+    jobs = [_job(f"Engineer {n}", f"https://acme.com/jobs/{n}") for n in range(1, 5)]
+    store.upsert(company_rows(ACME, jobs))
+    view = store.view()
+    assert len(view) == 2
+    assert view.iloc[1]["job post1 title"] == "Engineer 4"
+
+
+def test_touch_stops_at_the_limit(store):
+    jobs = [_job(f"Engineer {n}", f"https://acme.com/jobs/{n}") for n in range(1, 5)]
+    store.upsert(company_rows(ACME, jobs))
+    store.begin_run()
+    urls = ["https://acme.com/jobs/9"] + [j["url"] for j in jobs]  # /9 was never stored
+    assert store.touch(urls, limit=2) == 2
+    assert store.frame()["job title"].tolist() == ["Engineer 1", "Engineer 2"]
@@ -0,0 +1,40 @@
+# test_link_classifier.py – keyword scoring of job and careers links.
+
+
+import pytest
+
+from link_classifier import LinkClassifier, THRESHOLDS
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return LinkClassifier()
+
+
+@pytest.mark.parametrize("text", [
+    "Senior Software Engineer", "Data Science Lead", "Mechanical Engineering Lead", "Senior Engineers",
+    "Product Manager, Remote", "Summer Internship 2025", "VP of Sales", "Head of Finance",
+])
+def test_job_titles(classifier, text):
+    assert classifier.score(text).get("job", 0) >= THRESHOLDS["job"]
+
+
+@pytest.mark.parametrize("text", [
+    "International", "Meet our engineers", "Read more", "Engineering blog", "Case studies", "Our team",
+    "Internal tools", "Development news",
+])
+def test_not_job_titles(classifier, text):
+    assert classifier.score(text).get("job", 0) < THRESHOLDS["job"]
+
+
+@pytest.mark.parametrize("text", ["Careers", "Jobs", "Join our team", "Open positions", "We're hiring"])
+def test_careers_links(classifier, text):
+    assert classifier.score(text).get("careers", 0) >= THRESHOLDS["careers"]
+
+
+def test_classify_orders_by_score_then_page(classifier):
+    html = ('<a href="/blog">Blog</a><a href="/j/1">Engineer</a>'
+            '<a href="/j/2">Senior Staff Engineer</a><a href="/careers">Careers</a>')
+    found = classifier.classify(html, "https://acme.com/")
+    assert [url for _, _, url, _ in found["job"]] == ["https://acme.com/j/2", "https://acme.com/j/1"]
+    assert found["careers"][0][2] == "https://acme.com/careers"
@@ -0,0 +1,87 @@
+# test_output_sink.py – long <-> wide Data sheet conversion and the row sinks.
+
+
+import pandas as pd
+import pytest
+
+from output_sink import (OUTPUT_COLUMNS, ROW_COLUMNS, company_rows, open_sink, read_sink, to_long, to_wide,
+                         trim_torn_line)
+
+ACME = {"Company Name": "Acme", "Website URL": "https://acme.example", "Careers Page URL": "https://acme.example/jobs"}
+BETA = {"Company Name": "Beta", "Website URL": "https://beta.example"}
+
+
+def _jobs(n, prefix="Engineer"):
+    return [{"title": f"{prefix} {i}", "url": f"https://acme.example/jobs/{i}", "location": "Remote"}
+            for i in range(1, n + 1)]
+
+
+def _long(*companies):
+    rows = [r for company, jobs in companies for r in company_rows(company, jobs)]
+    return pd.DataFrame(rows, columns=ROW_COLUMNS)
+
+
+def test_to_wide_packs_three_posts_per_row():
+    wide = to_wide(_long((ACME, _jobs(4)), (BETA, [])))
+    assert list(wide.columns) == OUTPUT_COLUMNS
+    assert list(wide["Company Name"]) == ["Acme", "Acme", "Beta"]
+    assert list(wide.iloc[0][["job post1 title", "job post2 title", "job post3 title"]]) == \
+        ["Engineer 1", "Engineer 2", "Engineer 3"]
+    assert wide.iloc[1]["job post1 title"] == "Engineer 4"
+    assert pd.isna(wide.iloc[1]["job post2 title"])
+    # a company without postings still gets its row
+    assert pd.isna(wide.iloc[2]["job post1 title"])
+
+
+def test_round_trip_keeps_every_row():
+    long = _long((ACME, _jobs(5)), (BETA, []))
+    back = to_long(to_wide(long)).fillna("")
+    assert len(back) == len(long)
+    assert list(back["job title"]) == list(long["job title"])
+    assert list(back["job URL"]) == list(long["job URL"])
+    assert list(back["Company Name"]) == ["Acme"] * 5 + ["Beta"]
+
+
+def test_to_wide_of_nothing():
+    wide = to_wide(pd.DataFrame(columns=ROW_COLUMNS))
+    assert wide.empty and list(wide.columns) == OUTPUT_COLUMNS
+
+
+@pytest.mark.parametrize("ext", [".jsonl", ".csv", ".sqlite"])
+def test_sink_round_trip(tmp_path, ext):
+    path = str(tmp_path / f"rows{ext}")
+    sink = open_sink(path, durable=True)
+    for row in company_rows(ACME, _jobs(2)):
+        sink.write(row)
+    sink.close()
+    df = read_sink(path).fillna("")
+    assert list(df["job title"]) == ["Engineer 1", "Engineer 2"]
+    assert list(df["Company Name"]) == ["Acme", "Acme"]
+
+
+def test_durable_refuses_parquet(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "rows.parquet"), durable=True)
+
+
+@pytest.mark.parametrize("ext", [".jsonl", ".csv"])
+def test_append_after_a_torn_last_line(tmp_path, ext):
+    path = str(tmp_path / f"rows{ext}")
+    sink = open_sink(path)
+    sink.write(company_rows(ACME, _jobs(1))[0])
+    sink.close()
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"Company Name": "Be' if ext == ".jsonl" else "Beta,half a ro")  # killed mid-write
+    sink = open_sink(path, append=True)
+    sink.write(company_rows(BETA, [])[0])
+    sink.close()
+    assert list(read_sink(path)["Company Name"]) == ["Acme", "Beta"]
+
+
+def test_trim_torn_line_keeps_complete_files(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b": 2}\n')
+    assert trim_torn_line(str(path)) == 0
+    path.write_bytes(b"no newline at all")
+    assert trim_torn_line(str(path)) == 17
+    assert path.read_bytes() == b""
@@ -1,131 +1,229 @@
 #URL Validator - Quick check before submission
-#Randomly samples URLs from your output file and verifies they work
+#Checks every URL in your output file (concurrently, cached between runs) and writes a JSON report
 #Run this BEFORE submitting to catch any broken links
 
 
 import pandas as pd
 import requests
-import random
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from urllib.parse import urlparse
 
+from fetcher import get_engine
+from rate_limiter import host_of
+from retry_policy import CircuitOpenError, HostUnreachableError
+from output_sink import COMPANY_COLUMNS, to_long
+
+# URL columns of the long (one row per job) layout
+URL_COLUMNS = ['Website URL', 'LinkedIn URL', 'Careers Page URL', 'Job listings page URL', 'job URL']
+
+CHECK_CACHE_FILE = ".url_checks.sqlite"
+CHECK_TTL = 24 * 3600  # a URL checked within a day isn't checked again
+
 
 def validate_url(url, timeout=10):
     #Check if URL is valid and accessible
+    return _check_url(url, timeout)[:2]
+
+
+def _check_url(url, timeout=10):
+    #(ok, message, reached) - reached is False when the engine answered without asking the
+    #server (host's circuit open, or host recently unreachable), so the result isn't cached
     if not url or url == '' or pd.isna(url):
-        return False, "Empty URL"
+        return False, "Empty URL", True
     
     try:
         # basic URL format check
         parsed = urlparse(url)
         if not parsed.scheme or not parsed.netloc:
-            return False, "Invalid URL format"
+            return False, "Invalid URL format", True
         
         # try to fetch
-        response = requests.head(url, timeout=timeout, allow_redirects=True)
+        response = get_engine().fetch(url, method="HEAD", timeout=timeout, retries=1)
+        if response.error:
+            raise response.error
+        if response.status in (403, 405, 501):
+            # plenty of servers refuse HEAD - ask for the first KB with a GET instead
+            response = get_engine().fetch(url, timeout=timeout, retries=1, use_cache=False,
+                                          headers={"Range": "bytes=0-1023"})
+            if response.error:
+                raise response.error
         
-        if response.status_code < 400:
-            return True, f"OK ({response.status_code})"
+        if response.status < 400:
+            return True, f"OK ({response.status})", True
         else:
-            return False, f"HTTP {response.status_code}"
+            return False, f"HTTP {response.status}", True
             
+    except (CircuitOpenError, HostUnreachableError):
+        return False, "Host skipped (unreachable or failing)", False
     except requests.exceptions.Timeout:
-        return False, "Timeout"
+        return False, "Timeout", True
     except requests.exceptions.ConnectionError:
-        return False, "Connection error"
+        return False, "Connection error", True
     except Exception as e:
-        return False, f"Error: {str(e)[:50]}"
+        return False, f"Error: {str(e)[:50]}", True
+
+
+class CheckCache:
+    #Persistent URL check results, so re-validating the same output doesn't re-hit every URL
+
+    def __init__(self, path=CHECK_CACHE_FILE, ttl=CHECK_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS checks (
+                url TEXT PRIMARY KEY, ok INTEGER NOT NULL, message TEXT, checked_at REAL NOT NULL
+            )""")
+        self._db.commit()
+
+    def get_many(self, urls):
+        #{url: (ok, message)} for the URLs checked recently enough
+        cutoff = time.time() - self.ttl
+        found = {}
+        urls = list(urls)
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                for url, ok, message in self._db.execute(
+                        f"SELECT url, ok, message FROM checks WHERE checked_at >= ? "
+                        f"AND url IN ({','.join('?' * len(chunk))})", [cutoff] + chunk):
+                    found[url] = (bool(ok), message)
+        return found
+
+    def put(self, url, ok, message):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO checks (url, ok, message, checked_at) VALUES (?, ?, ?, ?)",
+                             (url, int(ok), message, time.time()))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def collect_urls(df):
+    #Data sheet -> one row per (company, type, url): URL columns melted in one step
+    long = to_long(df)
+    urls = long.melt(id_vars=['Company Name'], value_vars=URL_COLUMNS, var_name='type', value_name='url')
+    urls['url'] = urls['url'].fillna('').astype(str).str.strip()
+    urls = urls[urls['url'] != ''].drop_duplicates(['Company Name', 'type', 'url'])
+    urls = urls.rename(columns={'Company Name': 'company'}).fillna({'company': 'Unknown'})
+    urls['host'] = urls['url'].map(host_of)
+    return urls.reset_index(drop=True)
 
 
-def validate_output_file(excel_file='climate_jobs_assignment.xlsx', sample_size=20):
+def check_urls(urls, workers=32, per_host=4, timeout=10, cache=None):
+    """
+    Check every distinct URL once, concurrently: at most per_host requests in flight per
+    host (and the fetch engine's per-host rate limits on top), hosts interleaved so one
+    slow host can't take every worker. A host that won't connect is remembered by the
+    engine, so its remaining URLs fail fast (those results are not cached). Returns {url: (ok, message)}.
+    """
+    unique = pd.Series(pd.unique(pd.Series(list(urls), dtype=str)))
+    results = cache.get_many(unique) if cache else {}
+    todo = unique[~unique.isin(list(results))]
+    hosts = todo.map(host_of)
+    # round-robin across hosts: every host's 1st URL, then every host's 2nd, ...
+    todo = todo.iloc[hosts.groupby(hosts).cumcount().argsort(kind="stable")]
+    limits = {h: threading.BoundedSemaphore(per_host) for h in hosts.unique()}
+
+    def one(url):
+        with limits[host_of(url)]:
+            return url, _check_url(url, timeout=timeout)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate") as pool:
+        for url, (ok, message, reached) in pool.map(one, todo):
+            results[url] = (ok, message)
+            # a skipped host says nothing about this URL - check it for real next time
+            if cache and reached:
+                cache.put(url, ok, message)
+    return results
+
+
+def validate_output_file(excel_file='climate_jobs_assignment.xlsx', sample_size=None, report_path=None,
+                         workers=32, per_host=4):
     
-    #Validate random sample of URLs from output file
+    #Validate the URLs from output file (all of them, or a random sample of sample_size)
     #Checks: website URLs, LinkedIn URLs, careers pages, job URLs
+    #Writes a JSON report next to the workbook (or to report_path)
     
     print(f"\n Validating URLs from {excel_file}")
-    print(f"Checking random sample of {sample_size} URLs...\n")
     
     try:
         # load the data sheet
         df = pd.read_excel(excel_file, sheet_name='Data')
         print(f"✓ Loaded {len(df)} rows\n")
         
-        # collect all URLs to check
-        url_columns = [
-            'Website URL',
-            'LinkedIn URL', 
-            'Careers Page URL',
-            'Job listings page URL',
-            'job post1 URL',
-            'job post2 URL',
-            'job post3 URL'
-        ]
-        
-        all_urls = []
-        for col in url_columns:
-            if col in df.columns:
-                for idx, url in enumerate(df[col]):
-                    if url and url != '' and not pd.isna(url):
-                        all_urls.append({
-                            'type': col,
-                            'url': url,
-                            'company': df.loc[idx, 'Company Name'] if 'Company Name' in df.columns else 'Unknown'
-                        })
-        
-        print(f"Found {len(all_urls)} total URLs to check")
-        
-        # randomly sample
-        sample = random.sample(all_urls, min(sample_size, len(all_urls)))
-        
-        # validate each URL
-        results = {'valid': 0, 'invalid': 0, 'issues': []}
-        
-        for i, item in enumerate(sample, 1):
-            url_type = item['type']
-            url = item['url']
-            company = item['company']
-            
-            print(f"[{i}/{len(sample)}] Checking {url_type} for {company[:30]}...")
-            
-            is_valid, message = validate_url(url)
-            
-            if is_valid:
-                results['valid'] += 1
-                print(f"  ✓ {message}")
-            else:
-                results['invalid'] += 1
-                print(f"  ✗ {message}")
-                results['issues'].append({
-                    'company': company,
-                    'type': url_type,
-                    'url': url,
-                    'issue': message
-                })
+        urls = collect_urls(df)
+        if sample_size:
+            urls = urls[urls['url'].isin(pd.Series(urls['url'].unique()).sample(
+                min(sample_size, urls['url'].nunique())))]
+        print(f"Found {len(urls)} URLs to check ({urls['url'].nunique()} distinct, "
+              f"{urls['host'].nunique()} hosts)")
+        
+        started = time.monotonic()
+        cache = CheckCache()
+        checked = check_urls(urls['url'], workers=workers, per_host=per_host, cache=cache)
+        cache.close()
+        elapsed = time.monotonic() - started
+        
+        urls['ok'] = urls['url'].map(lambda u: checked[u][0])
+        urls['issue'] = urls['url'].map(lambda u: checked[u][1])
+        valid, invalid = int(urls['ok'].sum()), int((~urls['ok']).sum())
+        issues = urls[~urls['ok']][['company', 'type', 'url', 'issue']]
+        by_type = urls.groupby('type')['ok'].agg(valid='sum', total='count')
+        
+        report = {
+            'file': excel_file,
+            'checked_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_seconds': round(elapsed, 2),
+            'urls': len(urls),
+            'distinct_urls': int(urls['url'].nunique()),
+            'hosts': int(urls['host'].nunique()),
+            'valid': valid,
+            'invalid': invalid,
+            'by_type': {t: {'valid': int(r.valid), 'invalid': int(r.total - r.valid)} for t, r in by_type.iterrows()},
+            'issues': issues.to_dict('records'),
+        }
+        report_path = report_path or os.path.splitext(excel_file)[0] + '.validation.json'
+        with open(report_path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
         
         # print summary
         print("\n" + "="*60)
         print(" VALIDATION SUMMARY")
         print("="*60)
-        print(f"✓ Valid URLs: {results['valid']}/{len(sample)}")
-        print(f"✗ Invalid URLs: {results['invalid']}/{len(sample)}")
-        print(f"Success rate: {(results['valid']/len(sample)*100):.1f}%")
-        
-        if results['issues']:
-            print(f"\n  Found {len(results['issues'])} issues:")
-            for issue in results['issues'][:10]:  # show first 10
-                print(f"\n  Company: {issue['company']}")
-                print(f"  Type: {issue['type']}")
-                print(f"  URL: {issue['url']}")
-                print(f"  Issue: {issue['issue']}")
+        print(f"✓ Valid URLs: {valid}/{len(urls)}")
+        print(f"✗ Invalid URLs: {invalid}/{len(urls)}")
+        if len(urls):
+            print(f"Success rate: {(valid/len(urls)*100):.1f}%")
+        print(f"Checked in {elapsed:.1f}s - report written to {report_path}")
+        
+        if len(issues):
+            print(f"\n  Found {len(issues)} issues:")
+            for issue in issues.head(10).itertuples():  # show first 10
+                print(f"\n  Company: {issue.company}")
+                print(f"  Type: {issue.type}")
+                print(f"  URL: {issue.url}")
+                print(f"  Issue: {issue.issue}")
         
         print("\n" + "="*60)
         
-        if results['invalid'] / len(sample) > 0.2:  # more than 20% invalid
-            print("  WARNING: More than 20% of sampled URLs are invalid!")
+        if len(urls) and invalid / len(urls) > 0.2:  # more than 20% invalid
+            print("  WARNING: More than 20% of URLs are invalid!")
             print("Consider reviewing your data before submission.")
         else:
             print(" Validation looks good! Ready to submit.")
         
         print("="*60 + "\n")
+        return report
         
     except FileNotFoundError:
         print(f" File not found: {excel_file}")
@@ -141,17 +239,18 @@ def quick_check_data_sheet(excel_file='climate_jobs_assignment.xlsx'):
     try:
         df = pd.read_excel(excel_file, sheet_name='Data')
         
-        print(f"Total companies: {len(df)}")
-        print(f"Companies with websites: {df['Website URL'].notna().sum()}")
-        print(f"Companies with LinkedIn: {df['LinkedIn URL'].notna().sum()}")
-        print(f"Companies with careers pages: {df['Careers Page URL'].notna().sum()}")
+        # one row per job; company columns from each company's first row
+        long = to_long(df)
+        companies = long.drop_duplicates(['Company Name', 'Company Description'])
+        present = companies[COMPANY_COLUMNS].fillna('').astype(str).apply(lambda c: c.str.strip() != '')
+        
+        print(f"Total companies: {len(companies)}")
+        print(f"Companies with websites: {present['Website URL'].sum()}")
+        print(f"Companies with LinkedIn: {present['LinkedIn URL'].sum()}")
+        print(f"Companies with careers pages: {present['Careers Page URL'].sum()}")
         
         # count total jobs
-        total_jobs = 0
-        for i in range(1, 4):
-            col = f'job post{i} URL'
-            if col in df.columns:
-                total_jobs += df[col].notna().sum()
+        total_jobs = int((long['job URL'].fillna('').astype(str).str.strip() != '').sum())
         
         print(f"Total jobs scraped: {total_jobs}")
         
@@ -180,7 +279,7 @@ if __name__ == "__main__":
     
     print("\n" + "-"*60 + "\n")
     
-    # then validate URLs
-    validate_output_file(excel_file, sample_size=20)
+    # then validate URLs (all of them)
+    validate_output_file(excel_file)
     
     print("\n Tip: Manually verify 2-3 random entries in Excel before submitting!")
\ No newline at end of file